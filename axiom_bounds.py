@@ -1,9 +1,16 @@
-from pgel_sat import ProbabilisticKnowledgeBase, gel, is_satisfiable, solve
+from pgel_sat import ProbabilisticKnowledgeBase, gel
+from pgel_sat import ColumnPool, Session, get_probability_bounds
+from pgel_sat.linprog import LP_METHODS
+from concurrent.futures import ProcessPoolExecutor
 import argparse
 import math
 import numpy as np
+import pickle
+import scipy.sparse as sp
 
 EPSILON = 1e-7
+DIRECT_LP_METHOD = 'interior'
+BISECTION_LP_METHOD = 'simplex'
 
 
 def main():
@@ -11,15 +18,27 @@ def main():
     args = parser.parse_args()
 
     filename = args.file[0]
-    axiom = args.axiom[0].split()
+    if args.queries is not None or args.all_pbox:
+        if args.method != 'direct':
+            parser.error('batch queries only support the direct method')
+        kb = ProbabilisticKnowledgeBase.from_file(filename)
+        return show_many_bounds(kb, get_queries(kb, args), args.workers,
+                                args.lp_method or DIRECT_LP_METHOD)
+
+    if args.axiom is None:
+        parser.error('an axiom, --queries or --all-pbox is required')
+    axiom = args.axiom.split()
     assert len(axiom) == 3
 
     kb = ProbabilisticKnowledgeBase.from_file(filename)
     kb = extend_knowledge_base(kb, axiom)
 
-    min_bound = get_min_bound(kb)
-    max_bound = get_max_bound(kb)
+    bounds = get_bounds(kb, args.method, args.lp_method)
+    if bounds is None:
+        print('The knowledge base is unsatisfiable.')
+        return
 
+    min_bound, max_bound = bounds
     show_bounds(axiom, kb, min_bound, max_bound)
 
 
@@ -34,9 +53,33 @@ def init_argparse():
         help='path of the OWL file with the Probabilistic Graphic EL ontology')
 
     parser.add_argument(
-        'axiom', nargs=1, type=str,
+        'axiom', nargs='?', type=str,
         help='the axiom in ntriples format'
     )
+
+    parser.add_argument(
+        '--queries', type=str,
+        help='path of a file with one axiom in ntriples format per line, ' \
+             'all bounded with the knowledge base loaded once')
+
+    parser.add_argument(
+        '--all-pbox', action='store_true',
+        help='bound every axiom in the PBox')
+
+    parser.add_argument(
+        '--workers', default=1, type=int,
+        help='number of processes answering the batch queries')
+
+    parser.add_argument(
+        '--method', default='direct', choices=['direct', 'bisection'],
+        help='optimize the probability of the axiom directly, or bisect ' \
+             'it with satisfiability checks')
+
+    parser.add_argument(
+        '--lp-method', choices=LP_METHODS,
+        help='LP backend of the master problem, by default ' \
+             f'{DIRECT_LP_METHOD} for the direct method and ' \
+             f'{BISECTION_LP_METHOD} for bisection')
     return parser
 
 
@@ -49,45 +92,166 @@ def extend_knowledge_base(kb, axiom):
 
 
 def extend_pbox(kb):
-    kb.A = np.hstack((kb.A, np.zeros((kb.k, 1))))
-    kb.A = np.vstack((
-        kb.A,
-        np.hstack((np.zeros(kb.n - 1), 1))
-    ))
+    # restricts the new axiom, the last column, alone in a new row
+    kb.A = sp.bmat([[kb.A, None], [None, sp.identity(1)]], format='csr')
     kb.b = np.hstack((kb.b, 1))
     kb.signs += ['>=']
 
 
-def get_min_bound(kb):
-    if is_extended_kb_satisfiable(kb, '==', 0):
+def get_bounds(kb, method='direct', lp_method=None):
+    '''Returns the minimum and maximum probability of the last axiom of
+    the extended `kb`, or None when `kb` is unsatisfiable.'''
+    if method == 'direct':
+        # the restriction added by `extend_pbox` is only used by bisection
+        set_extended_restriction(kb, '>=', 0)
+        return get_probability_bounds(kb, kb.n - 1,
+                                      lp_method or DIRECT_LP_METHOD)
+
+    # one session for every step, which only changes the last restriction
+    # and starts from the worlds and the basis of the previous steps
+    with Session(kb, lp_method or BISECTION_LP_METHOD) as session:
+        if not is_extended_kb_satisfiable(session, '>=', 0):
+            return None
+        return get_min_bound(session), get_max_bound(session)
+
+
+def get_min_bound(session):
+    if is_extended_kb_satisfiable(session, '==', 0):
         return 0
 
     k = math.ceil(abs(math.log2(EPSILON)))
     v_max = 1
     for j in range(1, k + 1):
         v_min = v_max - 1 / (2 ** j)
-        if is_extended_kb_satisfiable(kb, '<=', v_min):
+        if is_extended_kb_satisfiable(session, '<=', v_min):
             v_max = v_min
     return v_max
 
 
-def get_max_bound(kb):
-    if is_extended_kb_satisfiable(kb, '==', 1):
+def get_max_bound(session):
+    if is_extended_kb_satisfiable(session, '==', 1):
         return 1
 
     k = math.ceil(abs(math.log2(EPSILON)))
     v_min = 0
     for j in range(1, k + 1):
         v_max = v_min + 1 / (2 ** j)
-        if is_extended_kb_satisfiable(kb, '>=', v_max):
+        if is_extended_kb_satisfiable(session, '>=', v_max):
             v_min = v_max
     return v_min
 
 
-def is_extended_kb_satisfiable(kb, sign: str, probability: float):
+def is_extended_kb_satisfiable(session, sign: str, probability: float):
+    session.set_restriction(session.kb.k - 1, sign, probability)
+    return session.solve()['satisfiable']
+
+
+def set_extended_restriction(kb, sign: str, probability: float):
     kb.signs[-1] = sign
     kb.b[-1] = probability
-    return is_satisfiable(kb)
+
+
+def get_queries(kb, args):
+    queries = []
+    if args.all_pbox:
+        queries += sorted(kb.pbox_axioms)
+    if args.queries is not None:
+        with open(args.queries) as queries_file:
+            for line in queries_file:
+                if line.strip() == '' or line.startswith('#'):
+                    continue
+                axiom = tuple(line.split())
+                assert len(axiom) == 3
+                queries += [axiom]
+    return queries
+
+
+def get_many_bounds(kb, queries, workers=1, lp_method=DIRECT_LP_METHOD):
+    '''Returns the bounds of every query, a PBox ID of `kb` or a new axiom
+    `(sub_concept, role, sup_concept)`, or None for all of them when `kb`
+    is unsatisfiable. `kb` is not changed.
+
+    The worlds found while solving `kb` seed the session of every query:
+    they are worlds of an extended KB too, with the new axiom false.
+    Queries are independent, so they are spread over `workers` processes,
+    each holding one copy of `kb`.
+    '''
+    with Session(kb, lp_method) as session:
+        if not session.solve()['satisfiable']:
+            return [None] * len(queries)
+        worlds = session.pool.worlds[:len(session.pool)]
+
+    if workers == 1:
+        worker = BoundsWorker(kb, worlds, lp_method)
+        return [worker(query) for query in queries]
+
+    with ProcessPoolExecutor(workers, initializer=init_bounds_worker,
+                             initargs=(kb, worlds, lp_method)) as executor:
+        return list(executor.map(answer_query, queries))
+
+
+class BoundsWorker:
+    '''Answers bound queries on its own copy of a knowledge base.'''
+
+    def __init__(self, kb, worlds, lp_method=DIRECT_LP_METHOD):
+        self.kb = kb
+        self.worlds = worlds
+        self.lp_method = lp_method
+        self.session = None
+
+    def __call__(self, query):
+        if isinstance(query, tuple):
+            return self.get_axiom_bounds(query)
+
+        if self.session is None:
+            # kept for all the PBox queries, which share their columns
+            self.session = Session(self.kb, self.lp_method,
+                                   pool=self.create_pool(0))
+        return self.session.get_probability_bounds(query)
+
+    def get_axiom_bounds(self, axiom):
+        sub_concept, role, sup_concept = axiom
+        kb = pickle.loads(pickle.dumps(self.kb))
+        arrow = gel.Arrow(kb.get_concept(sup_concept), kb.get_role(role))
+        if kb.get_concept(sub_concept).has_arrow(arrow):
+            pbox_id = next(a.pbox_id for a in kb.get_concept(
+                sub_concept).sup_arrows if a == arrow)
+            return (1., 1.) if pbox_id < 0 else self(pbox_id)
+
+        kb = extend_knowledge_base(kb, axiom)
+        set_extended_restriction(kb, '>=', 0)
+        return get_probability_bounds(kb, kb.n - 1, self.lp_method,
+                                      pool=self.create_pool(1))
+
+    def create_pool(self, new_axioms_count):
+        pool = ColumnPool(self.worlds.shape[1] + new_axioms_count)
+        for world in self.worlds:
+            pool.add(np.hstack((world, np.zeros(new_axioms_count, bool))))
+        return pool
+
+
+def init_bounds_worker(kb, worlds, lp_method):
+    global BOUNDS_WORKER
+    BOUNDS_WORKER = BoundsWorker(kb, worlds, lp_method)
+
+
+def answer_query(query):
+    return BOUNDS_WORKER(query)
+
+
+def show_many_bounds(kb, queries, workers=1, lp_method=DIRECT_LP_METHOD):
+    bounds = get_many_bounds(kb, queries, workers, lp_method)
+    for query, query_bounds in zip(queries, bounds):
+        if query_bounds is None:
+            print('The knowledge base is unsatisfiable.')
+            return
+
+        if isinstance(query, tuple):
+            axiom = query
+        else:
+            sub_concept, sup_concept, role = kb.pbox_axioms[query]
+            axiom = (sub_concept.iri, role.iri, sup_concept.iri)
+        show_bounds(axiom, kb, *query_bounds)
 
 
 def show_bounds(axiom, kb, min_bound, max_bound):
@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+import pgel_sat
+from pgel_sat import ProbabilisticKnowledgeBase, gel_max_sat, linprog
+from pgel_sat import pgel_sat as pgel_sat_module
+
+EXAMPLE_FILE = 'data/example.owl'
+BASELINE_FILE = 'data/benchmarks/baseline.json'
+OUTPUT_FILE = 'data/benchmarks/latest.json'
+
+RANDOM_PARAMS = {
+    'axioms_per_restriction': 2,
+    'coef_lo': -1,
+    'coef_hi': 1,
+    'b_lo': 0,
+    'b_hi': 1,
+    'sign_type': 'lo',
+    'roles_count': 3,
+}
+
+SCALES = {
+    'small': {'concepts_count': 50, 'axioms_count': 100,
+              'prob_axioms_count': 10, 'prob_restrictions_count': 10},
+    'medium': {'concepts_count': 300, 'axioms_count': 600,
+               'prob_axioms_count': 50, 'prob_restrictions_count': 50},
+    'large': {'concepts_count': 1000, 'axioms_count': 2000,
+              'prob_axioms_count': 200, 'prob_restrictions_count': 200},
+}
+CASES = ['example', *SCALES]
+
+STAGES = ['graph', 'min_cut', 'linprog', 'solve']
+
+
+def main():
+    parser = init_argparse()
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.cases, args.repeat, args.seed)
+    save_report(report, args.output)
+
+    baseline = None
+    if args.baseline is not None and os.path.exists(args.baseline):
+        baseline = load_report(args.baseline)
+
+    regressions = find_regressions(report, baseline, args.threshold,
+                                   args.min_delta)
+    print_report(report, baseline)
+
+    if args.save_baseline:
+        save_report(report, args.baseline)
+
+    if len(regressions) > 0:
+        print()
+        for key, ratio in regressions:
+            print(f'REGRESSION {key}: {ratio:.2f}x the baseline')
+        sys.exit(1)
+
+
+def init_argparse():
+    parser = argparse.ArgumentParser(
+        usage='%(prog)s [options]',
+        description='Time the stages of the PGEL-SAT algorithm and compare '
+                    'them with a baseline.'
+    )
+
+    parser.add_argument('-c', '--cases', nargs='+', default=CASES,
+                        choices=CASES, help='knowledge bases timed')
+
+    parser.add_argument('-r', '--repeat', nargs='?', default=5,
+                        type=int, help='number of timed runs of each stage')
+
+    parser.add_argument('--seed', nargs='?', default=0,
+                        type=int, help='seed of the random knowledge bases')
+
+    parser.add_argument('-o', '--output', nargs='?', default=OUTPUT_FILE,
+                        type=str, help='path of the JSON report written')
+
+    parser.add_argument('-b', '--baseline', nargs='?', default=BASELINE_FILE,
+                        type=str, help='path of the JSON report compared')
+
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store this report as the baseline')
+
+    parser.add_argument('--threshold', nargs='?', default=1.25, type=float,
+                        help='ratio to the baseline time flagged as a '
+                             'regression')
+
+    parser.add_argument('--min-delta', nargs='?', default=1e-3, type=float,
+                        help='seconds over the baseline time below which '
+                             'a slowdown is taken as noise')
+    return parser
+
+
+def run_benchmarks(cases=CASES, repeat=5, seed=0):
+    '''Times every stage of every case and returns a report, which maps
+    `case/stage` to the times, in seconds, of its `repeat` runs.'''
+    results = {}
+    for case in cases:
+        kb = get_kb(case, seed)
+        for stage, run in get_stages(kb, seed).items():
+            results[f'{case}/{stage}'] = measure(run, repeat)
+
+    return {
+        'version': pgel_sat.__version__,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'seed': seed,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def get_kb(case, seed):
+    if case == 'example':
+        return ProbabilisticKnowledgeBase.from_file(EXAMPLE_FILE)
+
+    random.seed(seed)
+    np.random.seed(seed)
+    return ProbabilisticKnowledgeBase.random(**SCALES[case], **RANDOM_PARAMS)
+
+
+def get_stages(kb, seed):
+    '''Returns the function timed for each stage. The min cut runs on a
+    graph built beforehand, and the LP is the last master problem of a
+    solve, with all the worlds it generated.'''
+    weights = np.random.default_rng(seed).uniform(-1, 1, kb.n)
+    weighted_graph = gel_max_sat.WeightedGraph(kb, weights)
+
+    result = pgel_sat.solve(kb)
+    c, C, d, signs = get_master(kb, result['pool'])
+
+    return {
+        'graph': lambda: gel_max_sat.WeightedGraph(kb, weights),
+        'min_cut': lambda: gel_max_sat.min_cut(weighted_graph),
+        'linprog': lambda: linprog.solve(c, C, d, signs),
+        'solve': lambda: pgel_sat.solve(kb),
+    }
+
+
+def get_master(kb, pool):
+    C = pgel_sat_module.initialize_C(kb)
+    for world in pool.worlds[:len(pool)]:
+        C.append_column(pgel_sat_module.world_column(kb, world))
+
+    c = np.zeros(C.shape[1])
+    c[:kb.n + kb.k + 1] = 1
+    d = pgel_sat_module.initialize_d(kb)
+    signs = pgel_sat_module.initialize_signs(kb)
+    return c, C.tocsc(), d, signs
+
+
+def measure(run, repeat):
+    # the first run pays for imports and caches, so it is not timed
+    run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times += [time.perf_counter() - start]
+
+    return {'min': min(times),
+            'median': statistics.median(times),
+            'times': times}
+
+
+def find_regressions(report, baseline, threshold=1.25, min_delta=1e-3):
+    '''Returns the `(key, ratio)` of the stages whose best time is over
+    `threshold` times, and `min_delta` seconds over, the best time of the
+    same stage in `baseline`. The stages missing from it are skipped.'''
+    if baseline is None:
+        return []
+
+    regressions = []
+    for key, times in report['results'].items():
+        if key not in baseline['results']:
+            continue
+
+        best = times['min']
+        baseline_best = baseline['results'][key]['min']
+        if best > threshold * baseline_best \
+                and best - baseline_best > min_delta:
+            regressions += [(key, best / baseline_best)]
+    return regressions
+
+
+def print_report(report, baseline=None):
+    print('{:24} {:>10} {:>10} {:>10}'.format(
+        'stage', 'min (ms)', 'median', 'baseline'))
+    for key, times in report['results'].items():
+        ratio = ''
+        if baseline is not None and key in baseline['results']:
+            ratio = '{:.2f}x'.format(
+                times['min'] / baseline['results'][key]['min'])
+        print('{:24} {:10.3f} {:10.3f} {:>10}'.format(
+            key, 1000 * times['min'], 1000 * times['median'], ratio))
+
+
+def save_report(report, filename):
+    directory = os.path.dirname(filename)
+    if directory != '':
+        os.makedirs(directory, exist_ok=True)
+    with open(filename, 'w') as report_file:
+        json.dump(report, report_file, indent=2)
+
+
+def load_report(filename):
+    with open(filename) as report_file:
+        return json.load(report_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,6 @@
-import time
 import numpy as np
 import pandas as pd
-import pgel_sat
+import experiment_runner
 import argparse
 
 IS_VERBOSE = False
@@ -45,14 +44,19 @@ def main():
         'roles_count': args.roles_count
     }
 
+    filename = get_filename(vars(args).values())
+
     data_set = run_experiments(
         kb_params,
         ranges,
-        args.test_count
+        args.test_count,
+        args.seed,
+        args.workers,
+        get_trials_filename(filename)
     )
 
     data_frame = create_data_frame(data_set)
-    export_data_frame(data_frame, vars(args).values())
+    export_data_frame(data_frame, filename)
 
 
 def init_argparse():
@@ -115,6 +119,12 @@ def init_argparse():
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='print the progress of the experiments')
 
+    parser.add_argument('-w', '--workers', nargs='?', default=1,
+                        type=int, help='number of processes running the tests')
+
+    parser.add_argument('--seed', nargs='?', default=0,
+                        type=int, help='seed of the random knowledge bases')
+
     return parser
 
 
@@ -123,38 +133,37 @@ def print_verbose(*args, **kwargs):
         print(*args, **kwargs)
 
 
-def run_experiments(kb_params, ranges, test_count):
-    data_set = []
-
+def run_experiments(kb_params, ranges, test_count, seed, workers,
+                    trials_filename):
+    experiments = []
     for param_key, param_range in ranges.items():
-        print_verbose(f'|- {param_key:10} -|')
-
-        experiment_params = {**kb_params}
         for param in param_range:
-            experiment_params[param_key] = param
-            data, exec_time = run_experiment(
-                experiment_params, test_count, param_key)
-            data_set += [data]
-            print_verbose(f'|   {param:3}  {exec_time:.5f}   |')
-
-        print_verbose('-------------\n')
-
-    return data_set
-
-
-def track_time(function):
-    def wrap(*args, **kwargs):
-        start = time.time()
-        result = function(*args, **kwargs)
-        end = time.time()
-        return result, end - start
-
-    return wrap
-
-
-@track_time
-def run_experiment(params, test_count, moving_param):
-    means, stds = test_pgel_satisfiability(params, test_count)
+            experiments += [(param_key, {**kb_params, param_key: param})]
+
+    def print_point(params, trials):
+        exec_time = sum(trial['time'] for trial in trials)
+        print_verbose(f'|   {params["concepts_count"]:3}'
+                      f'  {params["axioms_count"]:3}'
+                      f'  {params["prob_axioms_count"]:3}'
+                      f'  {exec_time:.5f}   |')
+
+    points_trials = experiment_runner.run_trials(
+        [params for _, params in experiments], test_count, seed,
+        trials_filename, workers, print_point)
+
+    return [get_data(params, trials, moving_param)
+            for (moving_param, params), trials
+            in zip(experiments, points_trials)]
+
+
+def get_data(params, trials, moving_param):
+    results = np.array([(trial['satisfiable'],
+                         trial['time'],
+                         trial['iterations'],
+                         trial['iteration_time_mean'])
+                        for trial in trials])
+    means = np.mean(results, axis=0)
+    stds = np.std(results, axis=0)
     (sat_mean, time_mean, iters_mean, iters_time_mean) = means
     (sat_std, time_std, iters_std, iters_time_std) = stds
 
@@ -168,27 +177,6 @@ def run_experiment(params, test_count, moving_param):
             iters_time_mean)
 
 
-def test_pgel_satisfiability(params, test_count):
-    def random_knowledge_bases():
-        for _ in range(test_count):
-            yield pgel_sat.ProbabilisticKnowledgeBase.random(**params)
-
-    results = np.empty((test_count, 4))
-    for idx, kb in enumerate(random_knowledge_bases()):
-        (sat, iters, iter_times), time = pgel_sat_is_satisfiable(kb)
-        results[idx, 0] = sat
-        results[idx, 1] = time
-        results[idx, 2] = iters
-        results[idx, 3] = 0 if iter_times == [] else np.mean(iter_times)
-
-    return np.mean(results, axis=0), np.std(results, axis=0)
-
-
-@track_time
-def pgel_sat_is_satisfiable(knowledge_base):
-    result = pgel_sat.solve(knowledge_base)
-    return result['satisfiable'], result['iterations'], result['iteration_times']
-
 def create_data_frame(data_set):
     return pd.DataFrame(
         data=data_set,
@@ -204,12 +192,19 @@ def create_data_frame(data_set):
         ])
 
 
-def export_data_frame(data_frame, arg_values):
+def get_filename(arg_values):
     filename = 'data/experiments/complexity/'
     filename += 'm{}-M{}-s{}-n{}-N{}-p{}-P{}-a{}-k{}-K{}-t{}-'
     filename += 'cl{}-ch{}-bl{}-bh{}-st{}-r{}'
     filename += '.csv'
-    filename = filename.format(*arg_values)
+    return filename.format(*arg_values)
+
+
+def get_trials_filename(filename):
+    return filename[:-len('.csv')] + '-trials.csv'
+
+
+def export_data_frame(data_frame, filename):
     data_frame.to_csv(filename, index=False)
 
 
@@ -0,0 +1,152 @@
+import csv
+import json
+import os
+import random
+import time
+import zlib
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pgel_sat
+
+TRIAL_FIELDS = ['point', 'trial', 'seed', 'satisfiable', 'time',
+                'iterations', 'iteration_time_mean']
+
+
+def run_trials(points, test_count, seed, trials_filename, workers=1,
+               on_point_done=None):
+    '''Runs `test_count` trials of every point, a dict of keyword arguments
+    of `ProbabilisticKnowledgeBase.random`, and returns the list of trial
+    results of each point, in the order of `points`.
+
+    Every (point, trial) task draws its KB with its own seed, derived from
+    `seed` and the task, so the results do not depend on `workers` or on
+    the order the tasks run. Each trial is appended to `trials_filename`
+    as soon as it ends, and the trials already there for the same seed are
+    not run again, so an interrupted sweep resumes where it stopped.
+    '''
+    keys = [point_key(point) for point in points]
+    results = {key: {} for key in keys}
+    for row in read_trials(trials_filename, seed):
+        if row['point'] in results and row['trial'] < test_count:
+            results[row['point']][row['trial']] = trial_result(row)
+
+    params = {key: point for key, point in zip(keys, points)}
+
+    def notify(key):
+        if on_point_done is not None and len(results[key]) == test_count:
+            on_point_done(params[key], list(results[key].values()))
+
+    tasks = []
+    for key in params:
+        notify(key)
+        tasks += [(key, trial) for trial in range(test_count)
+                  if trial not in results[key]]
+
+    with open_trials(trials_filename) as (trials_file, writer):
+        for key, trial, task_seed, result in run_tasks(
+                tasks, params, seed, workers):
+            writer.writerow({'point': key, 'trial': trial,
+                             'seed': task_seed, **result})
+            trials_file.flush()
+            results[key][trial] = result
+            notify(key)
+
+    return [[results[key][trial] for trial in range(test_count)]
+            for key in keys]
+
+
+def run_tasks(tasks, params, seed, workers):
+    seeds = {(key, trial): get_task_seed(seed, key, trial)
+             for key, trial in tasks}
+
+    if workers == 1:
+        for key, trial in tasks:
+            task_seed = seeds[key, trial]
+            yield key, trial, task_seed, run_trial(params[key], task_seed)
+        return
+
+    with ProcessPoolExecutor(workers) as executor:
+        futures = {
+            executor.submit(run_trial, params[key], seeds[key, trial]):
+            (key, trial) for key, trial in tasks}
+        for future in as_completed(futures):
+            key, trial = futures[future]
+            yield key, trial, seeds[key, trial], future.result()
+
+
+def run_trial(params, seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    kb = pgel_sat.ProbabilisticKnowledgeBase.random(**params)
+
+    start = time.time()
+    result = pgel_sat.solve(kb)
+    end = time.time()
+
+    iteration_times = result['iteration_times']
+    return {'satisfiable': int(result['satisfiable']),
+            'time': end - start,
+            'iterations': result['iterations'],
+            'iteration_time_mean':
+                0 if iteration_times == [] else np.mean(iteration_times)}
+
+
+def get_task_seed(seed, key, trial):
+    # crc32 instead of hash, which is salted differently in every process
+    entropy = [seed, zlib.crc32(key.encode()), trial]
+    return int(np.random.SeedSequence(entropy).generate_state(1)[0])
+
+
+def point_key(point):
+    return json.dumps(point, sort_keys=True)
+
+
+def trial_result(row):
+    return {'satisfiable': int(row['satisfiable']),
+            'time': float(row['time']),
+            'iterations': int(row['iterations']),
+            'iteration_time_mean': float(row['iteration_time_mean'])}
+
+
+def read_trials(trials_filename, seed):
+    if not os.path.exists(trials_filename):
+        return
+
+    with open(trials_filename, newline='') as trials_file:
+        for row in csv.DictReader(trials_file):
+            # a row cut by an interrupted write is run again
+            try:
+                row['trial'] = int(row['trial'])
+                is_seed = int(row['seed']) == get_task_seed(
+                    seed, row['point'], row['trial'])
+                trial_result(row)
+            except (ValueError, TypeError, AttributeError):
+                continue
+            if is_seed:
+                yield row
+
+
+@contextmanager
+def open_trials(trials_filename):
+    '''Opens the trials file for appending, writing the header when the
+    file is new.'''
+    is_new = not os.path.exists(trials_filename) \
+        or os.path.getsize(trials_filename) == 0
+    ends_with_newline = is_new or ends_with(trials_filename, b'\n')
+
+    with open(trials_filename, 'a', newline='') as trials_file:
+        if not ends_with_newline:
+            trials_file.write('\n')
+
+        writer = csv.DictWriter(trials_file, TRIAL_FIELDS)
+        if is_new:
+            writer.writeheader()
+        yield trials_file, writer
+
+
+def ends_with(filename, suffix):
+    with open(filename, 'rb') as file:
+        file.seek(-len(suffix), os.SEEK_END)
+        return file.read() == suffix
@@ -1,7 +1,6 @@
-import time
 import numpy as np
 import pandas as pd
-import pgel_sat
+import experiment_runner
 import argparse
 
 IS_VERBOSE = False
@@ -17,12 +16,17 @@ def main():
     axioms_range = range(args.axioms_range_min,
                          args.axioms_range_max, args.axioms_range_step)
 
+    filename = get_filename(vars(args).values())
+
     data_set = run_experiments(
         axioms_range,
         args.concepts_count,
         args.prob_axioms_count,
         test_count=args.test_count,
-        axioms_per_prob_restriction=args.axioms_per_prob_restriction,
+        seed=args.seed,
+        workers=args.workers,
+        trials_filename=get_trials_filename(filename),
+        axioms_per_restriction=args.axioms_per_prob_restriction,
         prob_restrictions_count=args.prob_restrictions_count,
         coef_lo=args.coef_lo,
         coef_hi=args.coef_hi,
@@ -33,7 +37,7 @@ def main():
     )
 
     data_frame = create_data_frame(data_set)
-    export_data_frame(data_frame, vars(args).values())
+    export_data_frame(data_frame, filename)
 
 
 def init_argparse():
@@ -87,6 +91,12 @@ def init_argparse():
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='print the progress of the experiments')
 
+    parser.add_argument('-w', '--workers', nargs='?', default=1,
+                        type=int, help='number of processes running the tests')
+
+    parser.add_argument('--seed', nargs='?', default=0,
+                        type=int, help='seed of the random knowledge bases')
+
     return parser
 
 
@@ -95,70 +105,42 @@ def print_verbose(*args, **kwargs):
         print(*args, **kwargs)
 
 
-def run_experiments(axioms_range, *args, **kwargs):
-    data_set = []
+def run_experiments(axioms_range, concepts_count, prob_axioms_count, *,
+                    test_count, seed, workers, trials_filename, **kwargs):
+    points = [{'concepts_count': concepts_count,
+               'axioms_count': axioms_count,
+               'prob_axioms_count': prob_axioms_count,
+               **kwargs}
+              for axioms_count in axioms_range]
+
+    def print_point(point, trials):
+        exec_time = sum(trial['time'] for trial in trials)
+        print_verbose('  {:3}  | {:.5f}'.format(
+            point['axioms_count'], exec_time))
+
     print_verbose('axioms |  time ')
     print_verbose('----------------')
-    for axioms_count in axioms_range:
-        print_verbose(end='  {:3}  | '.format(axioms_count))
-        experiment = (axioms_count, *args)
-        data, exec_time = run_experiment(*experiment, **kwargs)
-        data_set += [data]
-        print_verbose('{:.5f}'.format(exec_time))
-    return data_set
-
-
-def track_time(function):
-    def wrap(*args, **kwargs):
-        start = time.time()
-        result = function(*args, **kwargs)
-        end = time.time()
-        return result, end - start
-
-    return wrap
-
-
-@track_time
-def run_experiment(*args, **kwargs):
-    (sat_mean, time_mean), (sat_std, time_std) = test_pgel_satisfiability(*args, **kwargs)
-    axioms_count, concepts_count, prob_axioms_count = args
-    return (concepts_count,
-            axioms_count / concepts_count,
-            prob_axioms_count,
+    points_trials = experiment_runner.run_trials(
+        points, test_count, seed, trials_filename, workers, print_point)
+
+    return [get_data(point, trials)
+            for point, trials in zip(points, points_trials)]
+
+
+def get_data(point, trials):
+    results = np.array([(trial['satisfiable'], trial['time'])
+                        for trial in trials])
+    sat_mean, time_mean = np.mean(results, axis=0)
+    sat_std, time_std = np.std(results, axis=0)
+    return (point['concepts_count'],
+            point['axioms_count'] / point['concepts_count'],
+            point['prob_axioms_count'],
             sat_mean,
             time_mean,
             sat_std,
             time_std)
 
 
-def test_pgel_satisfiability(axioms_count,
-                             concepts_count,
-                             prob_axioms_count,
-                             *args,
-                             test_count,
-                             **kwargs):
-    def random_knowledge_bases():
-        for _ in range(test_count):
-            yield pgel_sat.ProbabilisticKnowledgeBase.random(
-                concepts_count,
-                axioms_count,
-                prob_axioms_count,
-                *(kwargs.values()))
-
-    sat_and_time_results = np.empty((test_count, 2))
-    for idx, kb in enumerate(random_knowledge_bases()):
-        sat, time = pgel_sat_is_satisfiable(kb)
-        sat_and_time_results[idx, 0] = sat
-        sat_and_time_results[idx, 1] = time
-
-    return np.mean(sat_and_time_results, axis=0), np.std(sat_and_time_results, axis=0)
-
-
-@track_time
-def pgel_sat_is_satisfiable(knowledge_base):
-    return pgel_sat.is_satisfiable(knowledge_base)
-
-
 def create_data_frame(data_set):
     return pd.DataFrame(
         data=data_set,
@@ -173,12 +155,19 @@ def create_data_frame(data_set):
         ])
 
 
-def export_data_frame(data_frame, arg_values):
+def get_filename(arg_values):
     filename = 'data/experiments/'
     filename += 'm{}-M{}-s{}-n{}-p{}-a{}-k{}-t{}-'
     filename += 'cl{}-ch{}-bl{}-bh{}-st{}-r{}'
     filename += '.csv'
-    filename = filename.format(*arg_values)
+    return filename.format(*arg_values)
+
+
+def get_trials_filename(filename):
+    return filename[:-len('.csv')] + '-trials.csv'
+
+
+def export_data_frame(data_frame, filename):
     data_frame.to_csv(filename, index=False)
 
 
@@ -1,5 +1,6 @@
 import sys
 from pgel_sat import ProbabilisticKnowledgeBase, solve
+from pgel_sat.linprog import LP_METHODS
 import argparse
 
 
@@ -17,7 +18,7 @@ def main():
     filename = args.file[0]
     kb = ProbabilisticKnowledgeBase.from_file(filename)
 
-    result = solve(kb)
+    result = solve(kb, lp_method=args.lp_method)
     print('is satisfiable:', result['satisfiable'])
     print(str_lp(result['lp']))
 
@@ -34,6 +35,9 @@ def init_argparse():
 
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='prints the problem and solution')
+
+    parser.add_argument('--lp-method', default='interior', choices=LP_METHODS,
+                        help='LP backend of the master problem')
     return parser
 
 
@@ -1,5 +1,14 @@
-from .pgel_sat import is_satisfiable, solve
+from .version import __version__
+from .pgel_sat import is_satisfiable, solve, get_probability_bounds, Session
+from .batch import solve_many, solve_as_completed
+from .incremental import IncrementalSession
 from .pgel import ProbabilisticKnowledgeBase
+from .column_pool import ColumnPool
+from .instrumentation import Collector, IterationRecord
 from . import gel
 
-__all__ = ['is_satisfiable', 'solve', 'ProbabilisticKnowledgeBase', 'gel', ]
+__all__ = ['__version__',
+           'is_satisfiable', 'solve', 'get_probability_bounds', 'Session',
+           'solve_many', 'solve_as_completed', 'IncrementalSession',
+           'ProbabilisticKnowledgeBase', 'ColumnPool',
+           'Collector', 'IterationRecord', 'gel', ]
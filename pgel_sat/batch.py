@@ -0,0 +1,191 @@
+import multiprocessing
+import os
+import pickle
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+from . import pgel_sat
+
+# a task is run again once after its worker crashed, in case the crash
+# came from the worker and not from the task
+MAX_ATTEMPTS = 2
+
+
+def solve_many(kbs, workers=None, timeout=None, **options):
+    '''Solves every knowledge base of `kbs` over a pool of `workers`
+    processes and returns their results in submission order.
+
+    The results are the dicts of `pgel_sat.solve(kb, **options)`. A solve
+    that raises, exceeds `timeout` seconds or crashes its worker gets a
+    result with `satisfiable` None and the reason under `error`, and the
+    rest of the batch goes on.
+    '''
+    results = {}
+    for index, result in solve_as_completed(kbs, workers, timeout,
+                                            **options):
+        results[index] = result
+    return [results[index] for index in range(len(results))]
+
+
+def solve_as_completed(kbs, workers=None, timeout=None, **options):
+    '''Like `solve_many`, but yields `(index, result)` pairs as the solves
+    complete, `index` being the position of the KB in `kbs`.
+
+    Each worker runs one task at a time and the timeout is enforced from
+    this process: a worker past its deadline is terminated and replaced,
+    even when it is stuck inside the LP solver. A task whose worker
+    crashed is put back in the queue and run again, alongside the others.
+    '''
+    workers = workers or os.cpu_count() or 1
+    tasks = ((index, kb, 1) for index, kb in enumerate(kbs))
+    retried = deque()
+    pool = [Worker(timeout, options) for _ in range(workers)]
+    try:
+        while True:
+            for worker in pool:
+                while worker.task is None:
+                    task = retried.popleft() if len(retried) > 0 \
+                        else next(tasks, None)
+                    if task is None:
+                        break
+                    try:
+                        worker.submit(task)
+                    except Exception as e:
+                        # the KB could not be sent, e.g. it does not pickle
+                        yield task[0], error_result(
+                            f'{type(e).__name__}: {e}')
+
+            busy = [worker for worker in pool if worker.task is not None]
+            if len(busy) == 0:
+                break
+
+            ready = wait([worker.connection for worker in busy],
+                         get_wait_time(busy))
+            for i, worker in enumerate(pool):
+                task = worker.task
+                if task is None:
+                    continue
+                if worker.connection in ready:
+                    is_alive, result = worker.receive()
+                elif worker.is_past_deadline():
+                    is_alive = False
+                    result = error_result(f'Timeout after {timeout} seconds')
+                else:
+                    continue
+
+                if not is_alive:
+                    worker.stop()
+                    pool[i] = Worker(timeout, options)
+                    if result is None:
+                        index, kb, attempts = task
+                        if attempts < MAX_ATTEMPTS:
+                            retried.append((index, kb, attempts + 1))
+                            continue
+                        result = error_result('Worker crashed')
+                if result is not None:
+                    yield task[0], result
+    finally:
+        for worker in pool:
+            worker.stop()
+
+
+def get_wait_time(busy):
+    deadlines = [worker.deadline for worker in busy
+                 if worker.deadline is not None]
+    if len(deadlines) == 0:
+        return None
+    return max(min(deadlines) - time.monotonic(), 0)
+
+
+class Worker:
+    '''A process that solves the tasks sent through its pipe, one at a
+    time. It reports when it is ready, so that its start-up does not count
+    against the timeout of its first task.'''
+
+    def __init__(self, timeout, options):
+        self.connection, child_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=work, args=(child_connection,), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+        self.timeout = timeout
+        self.options = options
+        self.is_ready = False
+        self.task = None
+        self.message = None
+        self.deadline = None
+
+    def submit(self, task):
+        '''Gives `task` to the worker, which starts it once it is ready.
+        Raises if the KB cannot be pickled, leaving the worker idle.'''
+        _, kb, _ = task
+        self.message = pickle.dumps((kb, self.options))
+        self.task = task
+        if self.is_ready:
+            self.start_task()
+
+    def start_task(self):
+        if self.timeout is not None:
+            self.deadline = time.monotonic() + self.timeout
+        self.connection.send_bytes(self.message)
+        self.message = None
+
+    def receive(self):
+        '''Returns whether the worker is alive, and the result of its task
+        if it sent one. A worker that dies while starting crashed its
+        task.'''
+        try:
+            message = self.connection.recv()
+        except (EOFError, OSError):
+            return False, None
+
+        if not self.is_ready:
+            self.is_ready = True
+            self.start_task()
+            return True, None
+
+        self.task = None
+        self.deadline = None
+        return True, message
+
+    def is_past_deadline(self):
+        return self.deadline is not None \
+            and time.monotonic() >= self.deadline
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+def work(connection):
+    warm_up()
+    connection.send(None)
+    while True:
+        try:
+            kb, options = pickle.loads(connection.recv_bytes())
+        except EOFError:
+            return
+        connection.send(solve_task(kb, options))
+
+
+def warm_up():
+    '''Loads the solver and runs it once, so that the first task of a
+    worker does not pay for imports and GLPK setup.'''
+    from .pgel import ProbabilisticKnowledgeBase
+    pgel_sat.solve(ProbabilisticKnowledgeBase('bot', 'top'))
+
+
+def solve_task(kb, options):
+    try:
+        return pgel_sat.solve(kb, **options)
+    except Exception as e:
+        return error_result(f'{type(e).__name__}: {e}')
+
+
+def error_result(error):
+    return {'satisfiable': None, 'iterations': 0, 'iteration_times': [],
+            'lp_times': [], 'error': error}
@@ -0,0 +1,85 @@
+import numpy as np
+
+INITIAL_CAPACITY = 16
+
+
+class ColumnPool:
+    '''Deduplicated store of the worlds generated for a knowledge base.
+
+    A world is the 0/1 pattern of the probabilistic axioms it satisfies, the
+    part of a column that depends on the GEL oracle. The worlds are kept as
+    rows of a boolean matrix, so pricing the whole pool is one product
+    `worlds @ weights`. A pool is only valid for knowledge bases with the
+    same axioms, e.g. the same KB solved again with other bounds;
+    `IncrementalSession` re-checks its worlds when the axioms change.
+    '''
+
+    def __init__(self, n, capacity=INITIAL_CAPACITY):
+        self.n = n
+        self.count = 0
+        self.worlds = np.empty((max(capacity, 1), n), dtype=np.bool_)
+        self.indexes = {}
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, world):
+        return key(world) in self.indexes
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(f'Invalid world index: {index}.')
+        return self.worlds[index]
+
+    def add(self, world):
+        '''Stores `world` unless already present and returns its index.'''
+        world = np.asarray(world, dtype=np.bool_)
+        if world.shape != (self.n,):
+            raise ValueError(
+                f'Invalid world shape: {world.shape}. Expected ({self.n},).')
+
+        world_key = key(world)
+        index = self.indexes.get(world_key)
+        if index is not None:
+            return index
+
+        if self.count == len(self.worlds):
+            self.worlds = grow(self.worlds)
+
+        index = self.count
+        self.worlds[index] = world
+        self.indexes[world_key] = index
+        self.count += 1
+        return index
+
+    def best(self, weights, excluded=()):
+        '''Returns the index and value of the world with maximum
+        `world @ weights`, skipping `excluded` indexes, or (None, None).'''
+        indexes, values = self.top(weights, 1, excluded)
+        if len(indexes) == 0:
+            return None, None
+        return int(indexes[0]), values[0]
+
+    def top(self, weights, count, excluded=()):
+        '''Returns the indexes and values of the `count` worlds with the
+        largest `world @ weights`, in decreasing order of value.'''
+        values = self.worlds[:self.count] @ np.asarray(weights, dtype=float)
+        if len(excluded) > 0:
+            values[np.fromiter(excluded, dtype=np.int64)] = -np.inf
+
+        count = min(count, self.count)
+        indexes = np.argpartition(-values, count - 1)[:count] \
+            if count > 0 else np.array([], dtype=np.int64)
+        indexes = indexes[np.argsort(-values[indexes], kind='stable')]
+        indexes = indexes[values[indexes] > -np.inf]
+        return indexes, values[indexes]
+
+
+def key(world):
+    return np.packbits(np.asarray(world, dtype=np.bool_)).tobytes()
+
+
+def grow(worlds):
+    new_worlds = np.empty((2 * len(worlds), worlds.shape[1]), dtype=np.bool_)
+    new_worlds[:len(worlds)] = worlds
+    return new_worlds
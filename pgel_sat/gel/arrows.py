@@ -2,6 +2,13 @@ from . import roles
 
 
 class Arrow:
+    '''An arrow to `concept` through `role`. Arrows are equal when they
+    share their concept and role, whatever their PBox IDs, and are hashed
+    by the integer IDs of both; concepts outside a knowledge base all have
+    ID -1 and are told apart by identity.'''
+
+    __slots__ = ('concept', 'role', 'pbox_id', 'is_derived')
+
     def __init__(self, concept, role, pbox_id=-1, is_derived=False):
         self.concept = concept
         self.role = role
@@ -15,11 +22,11 @@ class Arrow:
         if not isinstance(other, Arrow):
             return NotImplemented
 
-        return (self.concept == other.concept and
-                self.role == other.role)
+        return (self.concept is other.concept and
+                self.role is other.role)
 
     def __hash__(self):
-        return hash((self.concept.iri, self.role.iri))
+        return hash((self.concept.id, self.role.id))
 
     def __repr__(self):
         return f'Arrow({repr(self.concept)},' \
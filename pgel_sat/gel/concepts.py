@@ -1,16 +1,25 @@
 from . import roles
 from . import iri
 
+# shared by every concept until its first arrow is added
+NO_ARROWS = frozenset()
+
 
 class Concept:
+    '''A concept of the graph. Its `id` is dense within the knowledge base
+    it was added to, and -1 until then.'''
+
+    __slots__ = ('iri', 'id', 'sup_arrows', 'sub_arrows', '_is_empty')
+
+    is_individual = False
+    is_existential = False
+
     def __init__(self, iri):
         self.iri = str(iri)
-        self.sup_arrows = set()
-        self.sub_arrows = set()
+        self.id = -1
+        self.sup_arrows = NO_ARROWS
+        self.sub_arrows = NO_ARROWS
         self._is_empty = False
-        self.reaches = {self}
-        self.is_individual = False
-        self.is_existential = False
 
     @property
     def name(self):
@@ -24,10 +33,14 @@ class Concept:
 
     def add_arrow(self, sup_arrow):
         sup_concept = sup_arrow.concept
-        sub_arrow = sup_arrow.copy_from(self)
         if not self.has_arrow(sup_arrow):
+            if not self.sup_arrows:
+                self.sup_arrows = set()
+            if not sup_concept.sub_arrows:
+                sup_concept.sub_arrows = set()
+
             self.sup_arrows.add(sup_arrow)
-            sup_concept.sub_arrows.add(sub_arrow)
+            sup_concept.sub_arrows.add(sup_arrow.copy_from(self))
 
     def remove_arrow(self, sup_arrow):
         sup_concept = sup_arrow.concept
@@ -57,46 +70,56 @@ class Concept:
                 if a.role != without)
 
     def is_empty(self):
-        visited = set()
-
-        def _is_empty(concept):
+        # explicit stack, so that deep hierarchies do not hit the
+        # recursion limit; parents are kept to mark the path found
+        visited = {self}
+        parent = {self: None}
+        stack = [self]
+        while len(stack) > 0:
+            concept = stack.pop()
             if concept._is_empty:
+                while concept is not None:
+                    concept._is_empty = True
+                    concept = parent[concept]
                 return True
-            visited.add(concept)
-            reached = False
+
             for sup_concept in concept.is_a():
                 if sup_concept not in visited:
-                    reached = reached or _is_empty(sup_concept)
-            concept._is_empty = reached
-            return concept._is_empty
-        return _is_empty(self)
+                    visited.add(sup_concept)
+                    parent[sup_concept] = concept
+                    stack.append(sup_concept)
+        return False
 
     def sup_concepts_reached(self, role='all'):
-        visited = set()
-
-        def _sup_concepts_reached(concept):
-            visited.add(concept)
-            yield concept
-            for sup_concept in concept.sup_concepts(role=role):
-                if sup_concept not in visited:
-                    yield from _sup_concepts_reached(sup_concept)
-
-        yield from _sup_concepts_reached(self)
+        return depth_first(self, lambda c: c.sup_concepts(role=role))
 
     def sub_concepts_reach(self, role='all'):
-        visited = set()
+        return depth_first(self, lambda c: c.sub_concepts(role=role))
+
 
-        def _sub_concepts_reach(concept):
-            visited.add(concept)
-            yield concept
-            for sub_concept in concept.sub_concepts(role=role):
-                if sub_concept not in visited:
-                    yield from _sub_concepts_reach(sub_concept)
+def depth_first(concept, neighbours):
+    '''Yields the concepts reached from `concept` in depth-first preorder.
 
-        yield from _sub_concepts_reach(self)
+    A stack of neighbour iterators replaces the recursion, so each concept
+    costs O(1) no matter how deep it is in the hierarchy.
+    '''
+    visited = {concept}
+    yield concept
+    stack = [iter(neighbours(concept))]
+    while len(stack) > 0:
+        for next_concept in stack[-1]:
+            if next_concept not in visited:
+                visited.add(next_concept)
+                yield next_concept
+                stack.append(iter(neighbours(next_concept)))
+                break
+        else:
+            stack.pop()
 
 
 class EmptyConcept(Concept):
+    __slots__ = ()
+
     def __init__(self, iri):
         super().__init__(iri)
         self._is_empty = True
@@ -107,6 +130,8 @@ class EmptyConcept(Concept):
 
 
 class GeneralConcept(Concept):
+    __slots__ = ()
+
     def __init__(self, iri):
         super().__init__(iri)
 
@@ -116,14 +141,19 @@ class GeneralConcept(Concept):
 
 
 class InitialConcept(Concept):
+    __slots__ = ()
+
     def __init__(self, iri):
         super().__init__(iri)
 
 
 class IndividualConcept(Concept):
+    __slots__ = ()
+
+    is_individual = True
+
     def __init__(self, iri):
         super().__init__(iri)
-        self.is_individual = True
 
     @property
     def name(self):
@@ -131,11 +161,14 @@ class IndividualConcept(Concept):
 
 
 class ExistentialConcept(Concept):
+    __slots__ = ('concept_iri', 'role_iri')
+
+    is_existential = True
+
     def __init__(self, role_iri, concept_iri):
         self.concept_iri = concept_iri
         self.role_iri = role_iri
         super().__init__(f'{role_iri}.{iri.clear(concept_iri)}')
-        self.is_existential = True
 
     @property
     def name(self):
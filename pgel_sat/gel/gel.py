@@ -13,6 +13,8 @@ from collections import defaultdict
 
 
 class Axiom:
+    __slots__ = ('graph', 'sub_concept', 'sup_concept', 'role', 'pbox_id')
+
     def __init__(self, graph, sub_concept, sup_concept, role, pbox_id=-1):
         self.graph = graph
         self.sub_concept = graph.get_concept(sub_concept)
@@ -28,6 +30,13 @@ class Axiom:
     def is_new(self):
         return not self.sub_concept.has_arrow(self.arrow)
 
+    @property
+    def is_present(self):
+        '''Tells whether the graph has the arrow of this very axiom, with
+        the same PBox ID, since arrows are equal whatever their IDs.'''
+        return any(arrow == self.arrow and arrow.pbox_id == self.pbox_id
+                   for arrow in self.sub_concept.sup_arrows)
+
     @property
     def is_uncertain(self):
         return self.pbox_id >= 0
@@ -42,8 +51,12 @@ class Axiom:
         self.sub_concept.add_arrow(self.arrow)
         self.role.add_axiom(self.sub_concept, self.sup_concept)
 
+    def remove(self):
+        self.sub_concept.remove_arrow(self.arrow)
+        self.role.remove_axiom(self.sub_concept, self.sup_concept)
+
     def __hash__(self):
-        return hash((self.sub_concept.iri, self.sup_concept.iri, self.role.iri, self.pbox_id))
+        return hash((self.sub_concept.id, self.sup_concept.id, self.role.id, self.pbox_id))
 
     def __repr__(self):
         return f'Axiom({self.sub_concept}, {self.sup_concept}, {self.role}, {self.pbox_id})'
@@ -57,14 +70,91 @@ class KnowledgeBase:
 
         self.is_a = IsA()
 
-        self._concepts = {c.iri: c for c in [self.init, self.bot, self.top]}
-        self._roles = {r.iri: r for r in [self.is_a]}
+        self._concepts = {}
+        self._roles = {}
+        for concept in [self.init, self.bot, self.top]:
+            self.add_concept(concept)
+        self.add_role(self.is_a)
 
         self.role_inclusions = defaultdict(list)
         self.pbox_axioms = {}
 
         self.init.add_arrow(Arrow(self.top, self.is_a))
 
+    def __getstate__(self):
+        '''Returns the graph in a flat form, with concepts and roles
+        referenced by IRI, for pickling. Pickling the objects themselves
+        would recurse along the arrows and hash arrows whose concepts are
+        not rebuilt yet.'''
+        graph_state = {
+            'init': self.init.iri,
+            'bot': self.bot.iri,
+            'top': self.top.iri,
+            'is_a': self.is_a.iri,
+            'concepts': [(type(c), constructor_args(c))
+                         for c in self.concepts],
+            'roles': [(type(r), constructor_args(r)) for r in self.roles],
+            'arrows': [(c.iri, a.concept.iri, a.role.iri, a.pbox_id,
+                        a.is_derived)
+                       for c in self.concepts for a in c.sup_arrows],
+            'empty_concepts': [c.iri for c in self.concepts if c._is_empty],
+            'role_axioms': {r.iri: [(sub.iri, sup.iri)
+                                    for sub, sup in r.axioms]
+                            for r in self.roles},
+            'role_inclusions': {sub_roles: [r.iri for r in sup_roles]
+                                for sub_roles, sup_roles
+                                in self.role_inclusions.items()},
+            'pbox_axioms': {pbox_id: (sub.iri, sup.iri, role.iri)
+                            for pbox_id, (sub, sup, role)
+                            in self.pbox_axioms.items()},
+        }
+        attributes = {name: value for name, value in self.__dict__.items()
+                      if name not in GRAPH_ATTRIBUTES}
+        return graph_state, attributes
+
+    def __setstate__(self, state):
+        graph_state, attributes = state
+
+        self._concepts = {}
+        for cls, args in graph_state['concepts']:
+            concept = cls(*args)
+            concept.id = get_id(self._concepts, concept)
+            self._concepts[concept.iri] = concept
+        self._roles = {}
+        for cls, args in graph_state['roles']:
+            role = cls(*args)
+            role.id = get_id(self._roles, role)
+            self._roles[role.iri] = role
+
+        self.init = self._concepts[graph_state['init']]
+        self.bot = self._concepts[graph_state['bot']]
+        self.top = self._concepts[graph_state['top']]
+        self.is_a = self._roles[graph_state['is_a']]
+
+        for tail, head, role, pbox_id, is_derived in graph_state['arrows']:
+            self._concepts[tail].add_arrow(Arrow(
+                self._concepts[head], self._roles[role], pbox_id, is_derived))
+        for iri in graph_state['empty_concepts']:
+            self._concepts[iri]._is_empty = True
+
+        for iri, axioms in graph_state['role_axioms'].items():
+            self._roles[iri].axioms = [
+                (self._concepts[sub], self._concepts[sup])
+                for sub, sup in axioms]
+
+        self.role_inclusions = defaultdict(list)
+        for sub_roles, sup_roles in graph_state['role_inclusions'].items():
+            self.role_inclusions[sub_roles] = [
+                self._roles[iri] for iri in sup_roles]
+
+        self.pbox_axioms = {
+            pbox_id: (self._concepts[sub], self._concepts[sup],
+                      self._roles[role])
+            for pbox_id, (sub, sup, role)
+            in graph_state['pbox_axioms'].items()}
+
+        self.__dict__.update(attributes)
+
     @property
     def has_path_init_to_bot(self):
         return self.init.is_empty()
@@ -88,6 +178,7 @@ class KnowledgeBase:
         return list(self._roles.values())
 
     def add_concept(self, concept):
+        concept.id = get_id(self._concepts, concept)
         self._concepts[concept.iri] = concept
 
         if isinstance(concept, IndividualConcept):
@@ -158,6 +249,7 @@ class KnowledgeBase:
             is_immutable=True)
 
     def add_role(self, role):
+        role.id = get_id(self._roles, role)
         self._roles[role.iri] = role
 
     def get_role(self, role):
@@ -211,6 +303,24 @@ class KnowledgeBase:
     def add_pbox_axiom(self, axiom):
         self.pbox_axioms[axiom.pbox_id] = (axiom.sub_concept, axiom.sup_concept, axiom.role)
 
+    def remove_axiom(self, sub_concept, sup_concept, role, pbox_id=-1):
+        '''Removes an axiom added by `add_axiom` with the same arguments,
+        returning whether it was in the graph.'''
+        axiom = Axiom(self, sub_concept, sup_concept, role, pbox_id)
+        axiom.fix_existential_head()
+        if not axiom.is_present:
+            return False
+
+        axiom.remove()
+        if axiom.is_uncertain and self.pbox_axioms.get(axiom.pbox_id) == \
+                (axiom.sub_concept, axiom.sup_concept, axiom.role):
+            del self.pbox_axioms[axiom.pbox_id]
+
+        # the concepts marked empty may have lost their path to bottom
+        for concept in self.concepts:
+            concept._is_empty = isinstance(concept, EmptyConcept)
+        return True
+
     @classmethod
     def random(cls,
                concepts_count=20,
@@ -234,3 +344,25 @@ class KnowledgeBase:
         # add uncertain axioms randomly
         graph.add_random_axioms(uncertain_axioms_count, is_uncertain=True)
         return graph
+
+
+GRAPH_ATTRIBUTES = {'init', 'bot', 'top', 'is_a', '_concepts', '_roles',
+                    'role_inclusions', 'pbox_axioms'}
+
+
+def get_id(entities, entity):
+    '''Returns the ID of a concept or role about to be put in `entities`,
+    its position in the dict: the next one, or the one of the entity it
+    replaces.'''
+    if entity.iri in entities:
+        return entities[entity.iri].id
+    return len(entities)
+
+
+def constructor_args(entity):
+    '''Returns the arguments that build a copy of a concept or role.'''
+    if isinstance(entity, (ExistentialConcept, ArtificialRole)):
+        return (entity.role_iri, entity.concept_iri)
+    if isinstance(entity, IsA):
+        return ()
+    return (entity.iri,)
@@ -1,4 +1,4 @@
 def clear(iri):
     if '#' not in str(iri):
         return str(iri)
-    return ''.join(iri.split('#')[1:])
\ No newline at end of file
+    return ''.join(iri.split('#')[1:])
@@ -2,14 +2,22 @@ from . import iri
 
 
 class Role:
+    __slots__ = ('iri', 'id', 'axioms')
+
+    is_isa = False
+
     def __init__(self, iri):
         self.iri = iri
+        self.id = -1
         self.axioms = []
-        self.is_isa = False
 
     def add_axiom(self, sub_concept, sup_concept):
         self.axioms += [(sub_concept, sup_concept)]
 
+    def remove_axiom(self, sub_concept, sup_concept):
+        if (sub_concept, sup_concept) in self.axioms:
+            self.axioms.remove((sub_concept, sup_concept))
+
     @property
     def name(self):
         return iri.clear(self.iri)
@@ -19,12 +27,17 @@ class Role:
 
 
 class IsA(Role):
+    __slots__ = ()
+
+    is_isa = True
+
     def __init__(self):
         super().__init__('is a')
-        self.is_isa = True
 
 
 class ArtificialRole(Role):
+    __slots__ = ('role_iri', 'concept_iri')
+
     def __init__(self, role_iri, concept_iri):
         self.role_iri = role_iri
         self.concept_iri = concept_iri
@@ -1,14 +1,34 @@
-from copy import deepcopy
+import time
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse import csgraph
 from collections import namedtuple, deque
 
+# what a max flow did: augmenting paths found (None for engines that do not
+# augment along paths) and vertices reached by its breadth-first searches
+FlowCounts = namedtuple('FlowCounts', ['augmenting_paths', 'visited_vertices'])
+NO_FLOW_COUNTS = FlowCounts(None, None)
 
-def is_satisfiable(kb, weights):
-    return solve(kb, weights)['success']
+FlowRecord = namedtuple('FlowRecord', [
+    'graph_time',
+    'flow_time',
+    'augmenting_paths',
+    'visited_vertices'])
 
 
-def solve(kb, weights):
-    weighted_graph = WeightedGraph(kb, weights)
-    cut_set = min_cut(weighted_graph)
+def is_satisfiable(kb, weights, engine='edmonds-karp', template=None):
+    return solve(kb, weights, engine, template)['success']
+
+
+def solve(kb, weights, engine='edmonds-karp', template=None, on_record=None):
+    '''Finds a minimum cut of the network of `kb` under `weights`.
+    `template` is the `NetworkTemplate` of `kb`, or a `WeightedGraph` of it
+    refilled in place with `weights`. When given, `on_record` is called with the `FlowRecord` of the call; without
+    it nothing is timed.'''
+    if template is None:
+        template = NetworkTemplate(kb)
+
+    cut_set = cut_network(template, weights, engine, min_cut, on_record)
     if cut_set.has_infinity_weight:
         return {'success': False}
 
@@ -16,86 +36,417 @@ def solve(kb, weights):
             'prob_axiom_indexes': cut_set.prob_axiom_indexes}
 
 
-def min_cut(weighted_graph):
-    s = weighted_graph.init
-    t = weighted_graph.bottom
+def solve_cuts(kb, weights, engine='edmonds-karp', template=None,
+               on_record=None):
+    '''Like `solve`, but lists the axioms of every distinct extreme minimum
+    cut under `cuts`: the one closest to init and the one closest to bottom.
+    '''
+    if template is None:
+        template = NetworkTemplate(kb)
 
-    residual_graph = deepcopy(weighted_graph)
+    cut_sets = cut_network(template, weights, engine, min_cuts, on_record)
+    if cut_sets[0].has_infinity_weight:
+        return {'success': False}
 
-    is_there_augment_path, path = get_augment_path(residual_graph, s, t)
-    while is_there_augment_path:
-        augment_flow = get_augment_flow(path, residual_graph)
-        update_path_weights(path, residual_graph, augment_flow)
+    return {'success': True,
+            'cuts': [cut_set.prob_axiom_indexes for cut_set in cut_sets
+                     if not cut_set.has_infinity_weight]}
+
+
+def cut_network(template, weights, engine, cut, on_record):
+    if on_record is None:
+        return cut(get_weighted_graph(template, weights), engine)
+
+    start = time.perf_counter()
+    weighted_graph = get_weighted_graph(template, weights)
+    built = time.perf_counter()
+    result = cut(weighted_graph, engine)
+    end = time.perf_counter()
+
+    on_record(FlowRecord(built - start, end - built,
+                         *weighted_graph.flow_counts))
+    return result
+
+
+def get_weighted_graph(template, weights):
+    '''Returns a new graph of `template` under `weights` or, when
+    `template` is a `WeightedGraph`, that graph refilled in place.'''
+    if isinstance(template, WeightedGraph):
+        template.set_weights(weights)
+        return template
+    return template.weighted_graph(weights)
 
-        is_there_augment_path, path = get_augment_path(residual_graph, s, t)
 
-    visited = dfs(residual_graph, s)
+def min_cut(weighted_graph, engine='edmonds-karp'):
+    find_max_flow(weighted_graph, engine)
+
+    visited = dfs(weighted_graph, weighted_graph.init)
     cut_set = get_cut_set(weighted_graph, visited)
     return cut_set
 
 
+def min_cuts(weighted_graph, engine='edmonds-karp'):
+    '''Returns the minimum cuts closest to init and to bottom, which are
+    the same cut when the minimum cut is unique.'''
+    find_max_flow(weighted_graph, engine)
+
+    source_side = dfs(weighted_graph, weighted_graph.init)
+    sink_side = reverse_dfs(weighted_graph, weighted_graph.bottom)
+
+    cut_sets = [get_cut_set(weighted_graph, source_side)]
+    if (source_side != ~sink_side).any():
+        cut_sets += [get_cut_set(weighted_graph, ~sink_side)]
+    return cut_sets
+
+
+def find_max_flow(weighted_graph, engine='edmonds-karp'):
+    max_flow = get_engine(engine)
+
+    weighted_graph.reset_residual()
+    flow_counts = max_flow(
+        weighted_graph, weighted_graph.init, weighted_graph.bottom)
+    weighted_graph.flow_counts = flow_counts or NO_FLOW_COUNTS
+
+
+def get_engine(engine):
+    '''Returns the max-flow function named `engine`.
+
+    Every engine leaves in `residual_graph.residual` the residual weights of
+    a maximum flow, so the cut found afterwards is the same whichever
+    engine is used: the vertices reachable from `s` in the residual graph.
+    Engines may return the `FlowCounts` of their work.
+    '''
+    if callable(engine):
+        return engine
+    if engine not in ENGINES:
+        raise ValueError(
+            f'Invalid max-flow engine: {engine}. ' +
+            f'Choose one of: {", ".join(ENGINES)}.')
+    return ENGINES[engine]
+
+
+def edmonds_karp(residual_graph, s, t):
+    augmenting_paths = 0
+    is_there_augment_path, path, visited_vertices = get_augment_path(
+        residual_graph, s, t)
+    while is_there_augment_path:
+        augment_flow = get_augment_flow(path, residual_graph)
+        update_path_weights(path, residual_graph, augment_flow)
+        augmenting_paths += 1
+
+        is_there_augment_path, path, visited = get_augment_path(
+            residual_graph, s, t)
+        visited_vertices += visited
+    return FlowCounts(augmenting_paths, visited_vertices)
+
+
+def dinic(residual_graph, s, t):
+    '''Dinic's algorithm: blocking flows over BFS level graphs.'''
+    offsets = residual_graph.offsets.tolist()
+    head = residual_graph.head.tolist()
+    reverse = residual_graph.reverse.tolist()
+    weight = residual_graph.residual.tolist()
+
+    def get_levels():
+        level = [-1] * residual_graph.order
+        level[s] = 0
+        queue = deque([s])
+        while len(queue) > 0:
+            v = queue.popleft()
+            for arrow in range(offsets[v], offsets[v + 1]):
+                u = head[arrow]
+                if level[u] < 0 and weight[arrow] > 0:
+                    level[u] = level[v] + 1
+                    queue.append(u)
+        return level
+
+    def get_blocking_flow(level):
+        nonlocal augmenting_paths
+        current = offsets[:-1]
+        path = []
+        v = s
+        while True:
+            if v == t:
+                augment_flow = min(weight[arrow] for arrow in path)
+                for arrow in path:
+                    weight[arrow] -= augment_flow
+                    weight[reverse[arrow]] += augment_flow
+                augmenting_paths += 1
+                path = []
+                v = s
+                continue
+
+            arrow, end = current[v], offsets[v + 1]
+            while arrow < end and not (
+                    weight[arrow] > 0 and level[head[arrow]] == level[v] + 1):
+                arrow += 1
+            current[v] = arrow
+
+            if arrow < end:
+                path += [arrow]
+                v = head[arrow]
+                continue
+
+            # dead end: v cannot reach t in this level graph anymore
+            if v == s:
+                return
+            level[v] = -1
+            arrow = path.pop()
+            v = head[reverse[arrow]]
+            current[v] += 1
+
+    augmenting_paths = 0
+    level = get_levels()
+    visited_vertices = len(level) - level.count(-1)
+    while level[t] >= 0:
+        get_blocking_flow(level)
+        level = get_levels()
+        visited_vertices += len(level) - level.count(-1)
+
+    residual_graph.residual[:] = weight
+    return FlowCounts(augmenting_paths, visited_vertices)
+
+
+def push_relabel(residual_graph, s, t):
+    '''Highest-label push-relabel with gap and global relabel heuristics.
+
+    Excess that cannot reach `t` is pushed back to `s`, so the result is a
+    maximum flow and not only a maximum preflow.
+    '''
+    order = residual_graph.order
+    offsets = residual_graph.offsets.tolist()
+    head = residual_graph.head.tolist()
+    reverse = residual_graph.reverse.tolist()
+    weight = residual_graph.residual.tolist()
+
+    height = [0] * order
+    excess = [0.0] * order
+    current = offsets[:-1]
+    active = [[] for _ in range(2 * order + 1)]
+    count = [0] * (2 * order + 1)
+    highest = 0
+
+    def activate(v):
+        nonlocal highest
+        active[height[v]] += [v]
+        highest = max(highest, height[v])
+
+    def bfs_heights(root, base):
+        # distances to root, walking the residual arrows backwards
+        height[root] = base
+        queue = deque([root])
+        while len(queue) > 0:
+            v = queue.popleft()
+            for arrow in range(offsets[v], offsets[v + 1]):
+                u = head[arrow]
+                if not is_labeled[u] and weight[reverse[arrow]] > 0:
+                    is_labeled[u] = True
+                    height[u] = height[v] + 1
+                    queue.append(u)
+
+    def global_relabel():
+        nonlocal is_labeled, highest, visited_vertices
+        is_labeled = [False] * order
+        is_labeled[t] = is_labeled[s] = True
+        bfs_heights(t, 0)
+        bfs_heights(s, order)
+        visited_vertices += is_labeled.count(True)
+        for v in range(order):
+            if not is_labeled[v]:
+                height[v] = 2 * order
+
+        for bucket in active:
+            bucket.clear()
+        count[:] = [0] * (2 * order + 1)
+        highest = 0
+        for v in range(order):
+            count[height[v]] += 1
+            current[v] = offsets[v]
+            if excess[v] > 0 and v not in (s, t):
+                activate(v)
+
+    def gap(empty_height):
+        for v in range(order):
+            if empty_height < height[v] < order:
+                count[height[v]] -= 1
+                height[v] = order + 1
+                count[height[v]] += 1
+                current[v] = offsets[v]
+        for h in range(empty_height + 1, order):
+            active[order + 1] += active[h]
+            active[h] = []
+
+    def relabel(v):
+        min_height = 2 * order - 1
+        for arrow in range(offsets[v], offsets[v + 1]):
+            if weight[arrow] > 0:
+                min_height = min(min_height, height[head[arrow]])
+
+        old_height = height[v]
+        count[old_height] -= 1
+        height[v] = min(min_height + 1, 2 * order)
+        count[height[v]] += 1
+        current[v] = offsets[v]
+
+        if count[old_height] == 0 and old_height < order:
+            gap(old_height)
+
+    def discharge(v):
+        while excess[v] > 0 and height[v] < 2 * order:
+            arrow = current[v]
+            if arrow == offsets[v + 1]:
+                relabel(v)
+                continue
+
+            u = head[arrow]
+            if weight[arrow] > 0 and height[v] == height[u] + 1:
+                delta = min(excess[v], weight[arrow])
+                weight[arrow] -= delta
+                weight[reverse[arrow]] += delta
+                excess[v] -= delta
+                if excess[u] == 0 and u not in (s, t):
+                    excess[u] += delta
+                    activate(u)
+                else:
+                    excess[u] += delta
+            else:
+                current[v] += 1
+
+    for arrow in range(offsets[s], offsets[s + 1]):
+        delta = weight[arrow]
+        if delta > 0:
+            u = head[arrow]
+            weight[arrow] = 0
+            weight[reverse[arrow]] += delta
+            excess[u] += delta
+            excess[s] -= delta
+
+    is_labeled = []
+    visited_vertices = 0
+    global_relabel()
+    relabels_since_global = 0
+
+    while highest >= 0:
+        if len(active[highest]) == 0:
+            highest -= 1
+            continue
+
+        v = active[highest].pop()
+        if height[v] != highest:
+            # stale entry, v was moved by a gap or a global relabel
+            continue
+
+        old_height = height[v]
+        discharge(v)
+        if height[v] != old_height:
+            relabels_since_global += 1
+
+        if relabels_since_global > order:
+            global_relabel()
+            relabels_since_global = 0
+
+    residual_graph.residual[:] = weight
+    # push-relabel moves flow along single arrows, not along paths
+    return FlowCounts(None, visited_vertices)
+
+
 def get_augment_path(residual_graph, s, t):
-    def get_path(parent, s, t):
+    '''Breadth-first search over whole frontiers of vertices at a time.
+
+    Returns the arrows of a shortest path from `s` to `t` with positive
+    residual weight, from `t` back to `s`, and the number of vertices the
+    search reached.
+    '''
+    def get_path(parent_arrow, s, t):
         v = t
         while v != s:
-            yield (parent[v], v)
-            v = parent[v]
+            arrow = int(parent_arrow[v])
+            yield arrow
+            v = residual_graph.tail(arrow)
 
-    visited = [False] * residual_graph.order
-    parent = [0] * residual_graph.order
+    unvisited = -2
+    parent_arrow = np.full(residual_graph.order, unvisited)
+    parent_arrow[s] = -1
 
-    queue = deque([s])
-    visited[s] = True
-    parent[s] = -1
+    frontier = np.array([s])
+    visited_vertices = 1
+    while len(frontier) > 0 and parent_arrow[t] == unvisited:
+        arrows = residual_graph.arrows_from(frontier)
+        arrows = arrows[residual_graph.residual[arrows] > 0]
+        heads = residual_graph.head[arrows]
 
-    while len(queue) > 0:
-        u = queue.pop()
-        for arrow in residual_graph.adj[u]:
-            v = arrow.vertex
-            if not visited[v] and arrow.weight > 0:
-                queue.appendleft(v)
-                visited[v] = True
-                parent[v] = u
+        is_new = parent_arrow[heads] == unvisited
+        heads, first = np.unique(heads[is_new], return_index=True)
+        parent_arrow[heads] = arrows[is_new][first]
+        frontier = heads
+        visited_vertices += len(heads)
 
-    return visited[t], list(get_path(parent, s, t))
+    is_there_augment_path = parent_arrow[t] != unvisited
+    if not is_there_augment_path:
+        return False, [], visited_vertices
+    return True, list(get_path(parent_arrow, s, t)), visited_vertices
 
 
 def get_augment_flow(path, residual_graph):
     return min(
-        (residual_graph.get_weight(u, v) for u, v in path),
+        (residual_graph.residual[arrow] for arrow in path),
         default=residual_graph.infinity
     )
 
 
 def update_path_weights(path, residual_graph, augment_flow):
-    for u, v in path:
-        residual_graph.increment_weight(u, v, -augment_flow)
-        residual_graph.increment_weight(v, u, +augment_flow)
+    for arrow in path:
+        residual_graph.residual[arrow] -= augment_flow
+        residual_graph.residual[residual_graph.reverse[arrow]] += augment_flow
 
 
 def dfs(residual_graph, s):
-    def _dfs(residual_graph, v, visited):
-        visited[v] = True
-        for a in residual_graph.adj[v]:
-            u = a.vertex
-            if not visited[u] and residual_graph.get_weight(v, u) > 0:
-                _dfs(residual_graph, u, visited)
-
-    visited = [False] * residual_graph.order
-    _dfs(residual_graph, s, visited)
+    '''Marks the vertices reachable from `s` with positive residual weight.
+
+    The search expands whole frontiers of vertices with array operations
+    instead of recursing, so its depth is not bounded by the call stack.
+    '''
+    visited = np.zeros(residual_graph.order, dtype=bool)
+    visited[s] = True
+
+    frontier = np.array([s])
+    while len(frontier) > 0:
+        arrows = residual_graph.arrows_from(frontier)
+        arrows = arrows[residual_graph.residual[arrows] > 0]
+        heads = np.unique(residual_graph.head[arrows])
+        frontier = heads[~visited[heads]]
+        visited[frontier] = True
     return visited
 
 
-def get_cut_set(weighted_graph, visited):
-    has_infinity_weight = False
-    prob_axiom_indexes = weighted_graph.negative_arrows
+def reverse_dfs(residual_graph, t):
+    '''Marks the vertices that reach `t` with positive residual weight.'''
+    visited = np.zeros(residual_graph.order, dtype=bool)
+    visited[t] = True
 
-    for v, arrows in enumerate(weighted_graph.adj):
-        for arrow in arrows:
-            if visited[v] and not visited[arrow.vertex]:
-                if arrow.prob_axiom_index < 0:
-                    has_infinity_weight = True
-                prob_axiom_indexes += [arrow.prob_axiom_index]
+    frontier = np.array([t])
+    while len(frontier) > 0:
+        arrows = residual_graph.arrows_from(frontier)
+        arrows = arrows[
+            residual_graph.residual[residual_graph.reverse[arrows]] > 0]
+        heads = np.unique(residual_graph.head[arrows])
+        frontier = heads[~visited[heads]]
+        visited[frontier] = True
+    return visited
+
+
+def get_cut_set(weighted_graph, visited):
+    tails = weighted_graph.tails()
+    heads = weighted_graph.head
+    is_cut = weighted_graph.is_arrow & visited[tails] & ~visited[heads]
+
+    # parallel axioms share their arrow, so cutting it cuts all of them
+    template = weighted_graph.template
+    is_cut_axiom = weighted_graph.is_kept & is_cut[template.axiom_arrow]
+    cut_pbox_ids = template.axiom_pbox_id[is_cut_axiom]
+    has_infinity_weight = bool((cut_pbox_ids < 0).any())
+    prob_axiom_indexes = weighted_graph.negative_arrows \
+        + cut_pbox_ids.tolist()
 
     CutSet = namedtuple('CutSet', [
         'has_infinity_weight',
@@ -103,75 +454,203 @@ def get_cut_set(weighted_graph, visited):
     return CutSet(has_infinity_weight, prob_axiom_indexes)
 
 
-class WeightedGraph:
-    class Arrow:
-        def __init__(self, vertex, weight, prob_axiom_index):
-            self.vertex = vertex
-            self.weight = weight
-            self.prob_axiom_index = prob_axiom_index
+def is_consistent(template, world):
+    '''Tells whether bottom is unreachable from init along the certain
+    axioms and the probabilistic axioms that `world` holds, that is, if
+    `world` is a world of the knowledge base compiled into `template`.'''
+    world = np.asarray(world, dtype=np.bool_)
+    pbox_ids = template.axiom_pbox_id
+    is_prob = pbox_ids >= 0
+    is_held = ~is_prob
+    is_held[is_prob] = world[pbox_ids[is_prob]]
+
+    arrows = template.axiom_arrow[is_held]
+    tails = np.searchsorted(template.offsets, arrows, side='right') - 1
+    graph = sp.csr_matrix(
+        (np.ones(len(arrows)), (tails, template.head[arrows])),
+        shape=(template.order, template.order))
+    reached = csgraph.breadth_first_order(
+        graph, template.init, return_predecessors=False)
+    return template.bottom not in reached
+
+
+class NetworkTemplate:
+    '''Topology of the flow network of a knowledge base, compiled once.
+
+    Only the weights of the arrows change between pricing iterations, so
+    the CSR arrays (see `WeightedGraph`) are built once from the axioms
+    and shared, read-only, by every weighted graph created from them.
+    `axiom_arrow[i]` is the position of the arrow of the i-th axiom and
+    `axiom_pbox_id[i]` its PBox ID.
+    '''
+
+    def __init__(self, kb):
+        # concept IDs are the positions of the concepts in the KB
+        self.order = len(kb.concepts)
+        self.init = kb.init.id
+        self.bottom = kb.bot.id
 
-        def __repr__(self):
-            return f'({self.vertex}, {self.weight}, {self.prob_axiom_index})'
+        tails, heads, pbox_ids = [], [], []
+        for concept in kb.concepts:
+            for a in concept.sup_arrows:
+                tails += [concept.id]
+                heads += [a.concept.id]
+                pbox_ids += [a.pbox_id]
 
-    def __init__(self, kb, weights):
-        indexes = {j.iri: i for i, j in enumerate(kb.concepts)}
-        weights = [] if weights is None else weights
+        self.build(np.array(tails, dtype=np.int64),
+                   np.array(heads, dtype=np.int64),
+                   np.array(pbox_ids, dtype=np.int64))
 
-        self.order = len(kb.concepts)
-        self.infinity = max(weights) + 1 if len(weights) > 0 else 1
+    def build(self, tails, heads, pbox_ids):
+        order = self.order
 
-        self.init = indexes[kb.init.iri]
-        self.bottom = indexes[kb.bot.iri]
-        self.negative_arrows = []
+        keys = tails * order + heads
+        reverse_keys = heads * order + tails
+        all_keys = np.union1d(keys, reverse_keys)
 
-        self.adj = [[] for _ in range(self.order)]
+        self.head = all_keys % order
+        self.offsets = np.searchsorted(
+            all_keys // order, np.arange(order + 1))
+        self.reverse = np.searchsorted(
+            all_keys, self.head * order + all_keys // order)
 
-        def get_weight(arrow):
-            pbox_id = arrow.pbox_id
-            if pbox_id >= len(weights):
-                raise Exception(
-                    f'Invalid PBox ID: {pbox_id}. ' +
-                    f'You could define {pbox_id - len(weights) + 1}' +
-                    'more weights.')
+        self.axiom_arrow = np.searchsorted(all_keys, keys)
+        self.axiom_pbox_id = pbox_ids
 
-            if pbox_id < 0:
-                return self.infinity
-            return weights[pbox_id]
+        for array in (self.head, self.offsets, self.reverse,
+                      self.axiom_arrow, self.axiom_pbox_id):
+            array.flags.writeable = False
 
-        for concept in kb.concepts:
-            for a in concept.sup_arrows:
-                weight = get_weight(a)
+    @property
+    def size(self):
+        return len(self.head)
 
-                if weight < 0:
-                    self.negative_arrows += [a.pbox_id]
-                    continue
+    def weighted_graph(self, weights):
+        return WeightedGraph.from_template(self, weights)
 
-                vertex_1 = indexes[concept.iri]
-                vertex_2 = indexes[a.concept.iri]
-                self.increment_weight(vertex_1, vertex_2, weight)
-                self.add_pbox_id(vertex_1, vertex_2, a.pbox_id)
 
-    def add_arrow(self, vertex_1, vertex_2, weight, pbox_id=-1):
-        for arrow in self.adj[vertex_1]:
-            if arrow.vertex == vertex_2:
-                arrow.weight = weight
-                return
+class WeightedGraph:
+    '''Flow network over the concepts of a knowledge base, in CSR form.
+
+    The arrows leaving vertex `v` are stored at the positions
+    `offsets[v]:offsets[v + 1]` of the arrays `head` (the vertex reached),
+    `weight` (the capacity) and `reverse` (the position of the opposite
+    arrow), sorted by head. The opposite of every arrow is
+    stored as well, with weight 0 and `is_arrow` false when it is not in
+    the knowledge base, so residual updates are O(1) index operations.
+
+    The weights are never changed by a max flow, which works on the
+    `residual` weights instead: a buffer of the graph reset to `weight` by
+    `reset_residual`, so the flow is `weight - residual` and graphs
+    sharing a template keep their own flows. `set_weights` refills the
+    buffers of a graph in place, so one graph serves every oracle call of
+    a solve.
+
+    Axioms with negative weight are left out of the network and listed in
+    `negative_arrows`, and `is_kept` tells the axioms left in. Parallel
+    arrows are merged and their weights added, so a merged arrow is cut
+    along with all its axioms, and never when one of them is certain.
+    '''
 
-        arrow = self.Arrow(vertex_2, weight, pbox_id)
-        self.adj[vertex_1] += [arrow]
+    def __init__(self, kb, weights):
+        self.set_template(NetworkTemplate(kb))
+        self.set_weights(weights)
+
+    @classmethod
+    def from_template(cls, template, weights):
+        weighted_graph = cls.__new__(cls)
+        weighted_graph.set_template(template)
+        weighted_graph.set_weights(weights)
+        return weighted_graph
+
+    def set_template(self, template):
+        self.template = template
+        self.order = template.order
+        self.init = template.init
+        self.bottom = template.bottom
+        self.offsets = template.offsets
+        self.head = template.head
+        self.reverse = template.reverse
+
+        self.weight = np.zeros(template.size)
+        self.is_arrow = np.zeros(template.size, dtype=bool)
+        self.residual = np.zeros(template.size)
+
+    def set_weights(self, weights):
+        weights = np.asarray([] if weights is None else weights,
+                             dtype=np.float64)
+        template = self.template
+
+        # heavier than every cut of probabilistic axioms, whatever the sign
+        # of the weights, so that a certain axiom is never cut instead
+        self.infinity = weights[weights > 0].sum() + 1
+
+        pbox_ids = template.axiom_pbox_id
+        if len(pbox_ids) > 0 and pbox_ids.max() >= len(weights):
+            pbox_id = pbox_ids.max()
+            raise Exception(
+                f'Invalid PBox ID: {pbox_id}. ' +
+                f'You could define {pbox_id - len(weights) + 1}' +
+                'more weights.')
+
+        is_prob = pbox_ids >= 0
+        axiom_weights = np.full(len(pbox_ids), self.infinity)
+        axiom_weights[is_prob] = weights[pbox_ids[is_prob]]
+
+        is_kept = axiom_weights >= 0
+        self.negative_arrows = pbox_ids[~is_kept].tolist()
+
+        arrows = template.axiom_arrow[is_kept]
+        self.weight.fill(0)
+        np.add.at(self.weight, arrows, axiom_weights[is_kept])
+        self.is_arrow.fill(False)
+        self.is_arrow[arrows] = True
+        self.is_kept = is_kept
+
+    @property
+    def size(self):
+        return len(self.head)
+
+    def reset_residual(self):
+        np.copyto(self.residual, self.weight)
+
+    def flow(self):
+        return self.weight - self.residual
+
+    def tail(self, arrow):
+        return int(self.head[self.reverse[arrow]])
+
+    def tails(self):
+        return np.repeat(np.arange(self.order), np.diff(self.offsets))
+
+    def arrows_from(self, vertices):
+        '''Returns the positions of all arrows leaving `vertices`.'''
+        starts = self.offsets[vertices]
+        counts = self.offsets[vertices + 1] - starts
+        total = counts.sum()
+        shifts = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return np.arange(total) + shifts
+
+    def find_arrow(self, vertex_1, vertex_2):
+        start, end = self.offsets[vertex_1], self.offsets[vertex_1 + 1]
+        arrow = start + np.searchsorted(self.head[start:end], vertex_2)
+        if arrow < end and self.head[arrow] == vertex_2:
+            return int(arrow)
+        return -1
 
     def get_weight(self, vertex_1, vertex_2):
-        for arrow in self.adj[vertex_1]:
-            if arrow.vertex == vertex_2:
-                return arrow.weight
-        return 0
+        arrow = self.find_arrow(vertex_1, vertex_2)
+        return self.weight[arrow] if arrow >= 0 else 0
 
     def increment_weight(self, vertex_1, vertex_2, increment):
-        current_weight = self.get_weight(vertex_1, vertex_2)
-        self.add_arrow(vertex_1, vertex_2, current_weight + increment)
+        arrow = self.find_arrow(vertex_1, vertex_2)
+        if arrow < 0:
+            raise ValueError(f'Arrow missing: ({vertex_1}, {vertex_2})')
+        self.weight[arrow] += increment
 
-    def add_pbox_id(self, vertex_1, vertex_2, pbox_id):
-        for arrow in self.adj[vertex_1]:
-            if arrow.vertex == vertex_2 and pbox_id != -1:
-                arrow.prob_axiom_index = pbox_id
-                return
+
+ENGINES = {
+    'edmonds-karp': edmonds_karp,
+    'dinic': dinic,
+    'push-relabel': push_relabel,
+}
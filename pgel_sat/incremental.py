@@ -0,0 +1,177 @@
+import numpy as np
+import scipy.sparse as sp
+
+from . import gel_max_sat
+from .column_pool import ColumnPool
+from .pgel_sat import Session
+
+
+class IncrementalSession:
+    '''Solves a knowledge base again and again while it is edited.
+
+    The axioms and the PBox restrictions are edited through the session,
+    which keeps every world generated so far. After an axiom edit, the
+    next solve checks the stored worlds against the new graph and starts
+    the master problem from the valid ones, so only the worlds the edit
+    calls for are priced. The worlds do not depend on the restrictions, so
+    they are all kept on a restriction edit, and `set_restriction` even
+    keeps the master problem and its basis. The options are those of
+    `Session`.
+    '''
+
+    def __init__(self, kb, lp_method='interior', engine='edmonds-karp',
+                 max_columns=1, stabilization=None, on_iteration=None):
+        self.kb = kb
+        self.lp_method = lp_method
+        self.engine = engine
+        self.max_columns = max_columns
+        self.stabilization = stabilization
+        self.on_iteration = on_iteration
+
+        self.pool = ColumnPool(kb.n)
+        self.session = None
+        self.is_graph_changed = False
+        # the probabilistic axioms added since the last check of the worlds
+        self.added_pbox_ids = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def add_axiom(self, sub_concept, sup_concept, role, pbox_id=-1):
+        '''Adds an axiom as `gel.KnowledgeBase.add_axiom` does. A PBox ID
+        past the last axiom of the restrictions adds the axioms up to it,
+        with zero coefficients.'''
+        is_added = self.kb.add_axiom(sub_concept, sup_concept, role, pbox_id)
+        if is_added:
+            if pbox_id >= self.kb.n:
+                self.add_pbox_axioms(pbox_id + 1 - self.kb.n)
+            self.change_graph()
+            if pbox_id >= 0:
+                self.added_pbox_ids.add(pbox_id)
+        return is_added
+
+    def remove_axiom(self, sub_concept, sup_concept, role, pbox_id=-1):
+        '''Removes an axiom as `gel.KnowledgeBase.remove_axiom` does. The
+        PBox ID stays in the restrictions, held by every world.'''
+        is_removed = self.kb.remove_axiom(
+            sub_concept, sup_concept, role, pbox_id)
+        if is_removed:
+            self.change_graph()
+        return is_removed
+
+    def set_restriction(self, row, sign, value):
+        '''Changes the sign and the right-hand side of the PBox restriction
+        `row`.'''
+        if self.session is not None:
+            self.session.set_restriction(row, sign, value)
+            return
+
+        if not 0 <= row < self.kb.k:
+            raise ValueError(f'Invalid restriction: {row}.')
+        self.kb.signs[row] = sign
+        self.kb.b[row] = value
+
+    def add_restriction(self, axiom_restrictions, sign, value):
+        '''Adds the PBox restriction of the `(pbox_id, coefficient)` pairs
+        of `axiom_restrictions`, as read from an OWL file, and returns its
+        row.'''
+        pbox_ids = [pbox_id for pbox_id, _ in axiom_restrictions]
+        if len(pbox_ids) > 0 and min(pbox_ids) < 0:
+            raise ValueError(f'Invalid PBox ID: {min(pbox_ids)}.')
+        if len(pbox_ids) > 0 and max(pbox_ids) >= self.kb.n:
+            self.add_pbox_axioms(max(pbox_ids) + 1 - self.kb.n)
+
+        coefficients = [coefficient for _, coefficient in axiom_restrictions]
+        row = sp.csr_matrix(
+            (coefficients, ([0] * len(pbox_ids), pbox_ids)),
+            shape=(1, self.kb.n))
+        self.kb.add_probabilistic_restrictions(
+            sp.vstack([self.kb.A, row], format='csr'),
+            np.append(self.kb.b, value),
+            self.kb.signs + [sign])
+        self.close()
+        return self.kb.k - 1
+
+    def remove_restriction(self, row):
+        if not 0 <= row < self.kb.k:
+            raise ValueError(f'Invalid restriction: {row}.')
+
+        is_kept = np.arange(self.kb.k) != row
+        self.kb.add_probabilistic_restrictions(
+            self.kb.A[is_kept], self.kb.b[is_kept],
+            self.kb.signs[:row] + self.kb.signs[row + 1:])
+        self.close()
+
+    def add_pbox_axioms(self, count):
+        # every stored world holds the new axioms, as the oracle holds the
+        # ones without arrows; `valid_worlds` cuts an added one if needed
+        A = sp.hstack([self.kb.A, sp.csr_matrix((self.kb.k, count))],
+                      format='csr')
+        self.kb.add_probabilistic_restrictions(A, self.kb.b, self.kb.signs)
+
+        pool = ColumnPool(self.kb.n, len(self.pool))
+        for world in self.pool.worlds[:len(self.pool)]:
+            pool.add(np.concatenate((world, np.ones(count, dtype=np.bool_))))
+        self.pool = pool
+        self.close()
+
+    def change_graph(self):
+        self.is_graph_changed = True
+        self.close()
+
+    def open(self):
+        '''Returns the session of the current KB, started from every stored
+        world that is still valid.'''
+        if self.session is not None:
+            return self.session
+
+        if self.is_graph_changed:
+            self.pool = self.valid_worlds()
+            self.is_graph_changed = False
+            self.added_pbox_ids = set()
+
+        self.session = Session(self.kb, self.lp_method, self.engine,
+                               self.pool, self.max_columns,
+                               self.stabilization, self.on_iteration)
+        self.session.add_pool_columns()
+        return self.session
+
+    def valid_worlds(self):
+        '''Returns a pool of the stored worlds that are worlds of the
+        current graph. The axioms without arrows are held, as the oracle
+        holds them, and a world made invalid by added probabilistic axioms
+        is kept with them cut, which only removes paths.'''
+        template = gel_max_sat.NetworkTemplate(self.kb)
+        pbox_ids = template.axiom_pbox_id
+        has_arrow = np.zeros(self.kb.n, dtype=np.bool_)
+        has_arrow[pbox_ids[pbox_ids >= 0]] = True
+        is_added = np.zeros(self.kb.n, dtype=np.bool_)
+        is_added[list(self.added_pbox_ids)] = True
+
+        pool = ColumnPool(self.kb.n, len(self.pool))
+        for world in self.pool.worlds[:len(self.pool)]:
+            world = world | ~has_arrow
+            if not gel_max_sat.is_consistent(template, world):
+                world = world & ~is_added | ~has_arrow
+                if not gel_max_sat.is_consistent(template, world):
+                    continue
+            pool.add(world)
+        return pool
+
+    def solve(self):
+        '''Solves the current KB as `pgel_sat.solve`, adding the number of
+        stored worlds it started from under `warm_worlds`.'''
+        session = self.open()
+        warm_worlds = len(session.in_master)
+        return {**session.solve(), 'warm_worlds': warm_worlds}
+
+    def get_probability_bounds(self, pbox_id):
+        return self.open().get_probability_bounds(pbox_id)
@@ -0,0 +1,55 @@
+from collections import namedtuple
+
+# What one column generation iteration did. `pricing_time` covers the whole
+# pricing, of which `graph_time` builds the weighted graphs and `flow_time`
+# finds their cuts, over `oracle_calls` max flows. `reduced_cost` is the
+# lowest reduced cost of the columns added, for the duals they were priced
+# with, or None when no column improves and the iteration ends the run.
+# `lp_time` and `cost` are those of the master problem re-optimized with
+# the new columns, and `columns_count` counts all the columns in it.
+IterationRecord = namedtuple('IterationRecord', [
+    'iteration',
+    'lp_time',
+    'pricing_time',
+    'graph_time',
+    'flow_time',
+    'oracle_calls',
+    'augmenting_paths',
+    'visited_vertices',
+    'reduced_cost',
+    'cost',
+    'columns_added',
+    'columns_count',
+    'pool_hits'])
+
+
+class Collector:
+    '''Keeps the records it is called with, as an `on_iteration` callback
+    of `pgel_sat.solve`.'''
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records += [record]
+
+    def __len__(self):
+        return len(self.records)
+
+    def as_dicts(self):
+        return [record._asdict() for record in self.records]
+
+    def totals(self):
+        '''Returns the sum of every time and count over the records.'''
+        fields = ['lp_time', 'pricing_time', 'graph_time', 'flow_time',
+                  'oracle_calls', 'augmenting_paths', 'visited_vertices',
+                  'columns_added', 'pool_hits']
+        return {field: sum(getattr(record, field) or 0
+                           for record in self.records)
+                for field in fields}
+
+
+def sum_flow_records(flow_records, field):
+    values = [getattr(record, field) for record in flow_records
+              if getattr(record, field) is not None]
+    return sum(values) if len(values) > 0 else None
@@ -0,0 +1,231 @@
+import hashlib
+import os
+import tempfile
+import zipfile
+import zlib
+
+import numpy as np
+import scipy.sparse as sp
+
+from .gel.concepts import (
+    Concept,
+    EmptyConcept,
+    GeneralConcept,
+    ExistentialConcept,
+    IndividualConcept,
+)
+from .gel.roles import Role, IsA, ArtificialRole
+from .version import __version__
+
+CACHE_DIR_VARIABLE = 'PGEL_SAT_CACHE_DIR'
+# bumped whenever the arrays written by `encode` change
+FORMAT_VERSION = 1
+
+CONCEPT_TYPES = (Concept, EmptyConcept, GeneralConcept, ExistentialConcept,
+                 IndividualConcept)
+ROLE_TYPES = (Role, IsA, ArtificialRole)
+PBOX_ATTRIBUTES = {'A', 'b', 'signs'}
+
+NONE = -1
+READ_ERRORS = (OSError, ValueError, KeyError, IndexError, EOFError,
+               zipfile.BadZipFile, zlib.error)
+
+
+def get_cache_dir(cache_dir=None):
+    '''Returns `cache_dir`, or the directory in the PGEL_SAT_CACHE_DIR
+    environment variable, or None when caching is off.'''
+    return cache_dir or os.environ.get(CACHE_DIR_VARIABLE) or None
+
+
+def get_path(file, cache_dir):
+    '''Returns the entry of the OWL `file` in `cache_dir`, named after its
+    content, the library version and the format version, so that editing
+    the file or upgrading the library misses the stale entries.'''
+    digest = hashlib.sha256(f'{__version__}:{FORMAT_VERSION}:'.encode())
+    with open(file, 'rb') as owl_file:
+        for chunk in iter(lambda: owl_file.read(1 << 20), b''):
+            digest.update(chunk)
+    return os.path.join(cache_dir, digest.hexdigest() + '.npz')
+
+
+def load(cls, path):
+    '''Returns the knowledge base of class `cls` stored in `path`, or None
+    when the entry is missing, unreadable or fails its checksum.'''
+    try:
+        with np.load(path, allow_pickle=False) as entry:
+            arrays = {name: entry[name] for name in entry.files}
+        checksum = arrays.pop('checksum')
+        if checksum.tobytes() != get_checksum(arrays):
+            return None
+        return decode(cls, arrays)
+    except READ_ERRORS:
+        return None
+
+
+def store(kb, path):
+    '''Writes `kb` to `path`. The entry is replaced atomically, so readers
+    never see a half written one, and a KB the format cannot represent or
+    a cache directory that cannot be written is silently skipped.'''
+    arrays = encode(kb)
+    if arrays is None:
+        return
+    arrays['checksum'] = np.frombuffer(get_checksum(arrays), dtype=np.uint8)
+
+    cache_dir = os.path.dirname(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            np.savez_compressed(temp_file, **arrays)
+        os.replace(temp_path, path)
+    except OSError:
+        os.remove(temp_path)
+
+
+def encode(kb):
+    '''Returns the graph and PBox of `kb` as arrays of integers indexing a
+    table of IRIs, or None if it has state other than those.'''
+    graph_state, attributes = kb.__getstate__()
+    if set(attributes) != PBOX_ATTRIBUTES:
+        return None
+
+    strings = {}
+
+    def index(string):
+        return strings.setdefault(string, len(strings))
+
+    def entity_row(types, entity_type, args):
+        indexes = [index(arg) for arg in args]
+        return [types.index(entity_type)] + indexes + \
+            [NONE] * (2 - len(indexes))
+
+    if any(entity_type not in CONCEPT_TYPES
+           for entity_type, _ in graph_state['concepts']) \
+            or any(entity_type not in ROLE_TYPES
+                   for entity_type, _ in graph_state['roles']):
+        return None
+
+    concepts = [entity_row(CONCEPT_TYPES, entity_type, args)
+                for entity_type, args in graph_state['concepts']]
+    roles = [entity_row(ROLE_TYPES, entity_type, args)
+             for entity_type, args in graph_state['roles']]
+    roots = [index(graph_state[name])
+             for name in ('init', 'bot', 'top', 'is_a')]
+
+    arrows = [(index(tail), index(head), index(role), pbox_id, is_derived)
+              for tail, head, role, pbox_id, is_derived
+              in graph_state['arrows']]
+    empty_concepts = [index(iri) for iri in graph_state['empty_concepts']]
+    role_axioms = [(index(role), index(sub), index(sup))
+                   for role, axioms in graph_state['role_axioms'].items()
+                   for sub, sup in axioms]
+
+    role_inclusions = []
+    for sub_roles, sup_roles in graph_state['role_inclusions'].items():
+        # the key is a role, or the pair of a chained role inclusion
+        if isinstance(sub_roles, tuple):
+            sub_role1, sub_role2 = map(index, sub_roles)
+        else:
+            sub_role1, sub_role2 = index(sub_roles), NONE
+        role_inclusions += [(sub_role1, sub_role2, index(sup_role))
+                            for sup_role in sup_roles]
+
+    pbox_axioms = [(pbox_id, index(sub), index(sup), index(role))
+                   for pbox_id, (sub, sup, role)
+                   in graph_state['pbox_axioms'].items()]
+
+    if not all(isinstance(string, str) for string in strings):
+        return None
+
+    A = sp.coo_matrix(attributes['A'])
+    return {
+        'strings': np.array(list(strings), dtype=str),
+        'roots': np.array(roots, dtype=np.int64),
+        'concepts': int_table(concepts, 3),
+        'roles': int_table(roles, 3),
+        'arrows': int_table(arrows, 5),
+        'empty_concepts': np.array(empty_concepts, dtype=np.int64),
+        'role_axioms': int_table(role_axioms, 3),
+        'role_inclusions': int_table(role_inclusions, 3),
+        'pbox_axioms': int_table(pbox_axioms, 4),
+        'A_shape': np.array(A.shape, dtype=np.int64),
+        'A_rows': A.row.astype(np.int64),
+        'A_cols': A.col.astype(np.int64),
+        'A_data': A.data.astype(float),
+        'b': np.asarray(attributes['b'], dtype=float),
+        'signs': np.array(attributes['signs'], dtype=str),
+    }
+
+
+def decode(cls, arrays):
+    '''Rebuilds a knowledge base of class `cls` from the arrays of
+    `encode`.'''
+    strings = arrays['strings'].tolist()
+
+    def entity(types, row):
+        entity_type, *args = row
+        return types[entity_type], tuple(strings[arg] for arg in args
+                                         if arg != NONE)
+
+    init, bot, top, is_a = (strings[i] for i in arrays['roots'].tolist())
+
+    role_axioms = {}
+    for role, sub, sup in arrays['role_axioms'].tolist():
+        role_axioms.setdefault(strings[role], []).append(
+            (strings[sub], strings[sup]))
+
+    role_inclusions = {}
+    for sub_role1, sub_role2, sup_role in arrays['role_inclusions'].tolist():
+        sub_roles = strings[sub_role1] if sub_role2 == NONE \
+            else (strings[sub_role1], strings[sub_role2])
+        role_inclusions.setdefault(sub_roles, []).append(strings[sup_role])
+
+    graph_state = {
+        'init': init,
+        'bot': bot,
+        'top': top,
+        'is_a': is_a,
+        'concepts': [entity(CONCEPT_TYPES, row)
+                     for row in arrays['concepts'].tolist()],
+        'roles': [entity(ROLE_TYPES, row)
+                  for row in arrays['roles'].tolist()],
+        'arrows': [(strings[tail], strings[head], strings[role], pbox_id,
+                    bool(is_derived))
+                   for tail, head, role, pbox_id, is_derived
+                   in arrays['arrows'].tolist()],
+        'empty_concepts': [strings[i]
+                           for i in arrays['empty_concepts'].tolist()],
+        'role_axioms': role_axioms,
+        'role_inclusions': role_inclusions,
+        'pbox_axioms': {pbox_id: (strings[sub], strings[sup], strings[role])
+                        for pbox_id, sub, sup, role
+                        in arrays['pbox_axioms'].tolist()},
+    }
+
+    A = sp.csr_matrix(
+        (arrays['A_data'], (arrays['A_rows'], arrays['A_cols'])),
+        shape=tuple(arrays['A_shape'].tolist()))
+    attributes = {'A': A,
+                  'b': arrays['b'],
+                  'signs': arrays['signs'].tolist()}
+
+    kb = cls.__new__(cls)
+    kb.__setstate__((graph_state, attributes))
+    return kb
+
+
+def int_table(rows, width):
+    return np.array(rows, dtype=np.int64).reshape(len(rows), width)
+
+
+def get_checksum(arrays):
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f'{name}:{array.dtype.str}:{array.shape}:'.encode())
+        digest.update(array.tobytes())
+    return digest.digest()
@@ -1,9 +1,17 @@
+import ctypes
+import functools
+import time
 import numpy as np
+import scipy.optimize
+import scipy.sparse as sp
 import swiglpk as glpk
 from collections import namedtuple
+from .sparse import ColumnMatrix
 
 LPSolution = namedtuple('LPSolution', ['x', 'y', 'cost'])
 
+LP_METHODS = ('simplex', 'interior', 'highs')
+
 
 def solve(c, C, d, signs=None):
     lp = create_minimization_problem()
@@ -33,9 +41,10 @@ def create_minimization_problem():
 def set_rows(lp, d, signs):
     rows_count = len(d)
     bnd_types = get_bnd_types(signs, rows_count)
+    bnds = np.asarray(d, dtype=np.float64).tolist()
     glpk.glp_add_rows(lp, rows_count)
-    for idx, (bnd_type, bnd) in enumerate(zip(bnd_types, d)):
-        glpk.glp_set_row_bnds(lp, idx + 1, bnd_type, bnd, bnd)
+    for idx, (bnd_type, bnd) in enumerate(zip(bnd_types, bnds), 1):
+        glpk.glp_set_row_bnds(lp, idx, bnd_type, bnd, bnd)
 
     return rows_count
 
@@ -55,38 +64,88 @@ def get_bnd_types(signs, rows_count):
 
 def set_objective(lp, c):
     cols_count = len(c)
+    coefs = np.asarray(c, dtype=np.float64).tolist()
     glpk.glp_add_cols(lp, cols_count)
-    for idx, coef in enumerate(c):
-        glpk.glp_set_col_bnds(lp, idx + 1, glpk.GLP_LO, 0.0, 0.0)
-        glpk.glp_set_obj_coef(lp, idx + 1, coef)
+    for idx, coef in enumerate(coefs, 1):
+        glpk.glp_set_col_bnds(lp, idx, glpk.GLP_LO, 0.0, 0.0)
+        glpk.glp_set_obj_coef(lp, idx, coef)
 
     return cols_count
 
 
 def set_coefficients(lp, C):
-    elements_count = np.count_nonzero(C)
-    i_C = glpk.intArray(1 + elements_count)
-    j_C = glpk.intArray(1 + elements_count)
-    a_C = glpk.doubleArray(1 + elements_count)
-
-    for idx, (i, j) in enumerate(zip(*C.nonzero()), 1):
-        i_C[idx] = int(i + 1)
-        j_C[idx] = int(j + 1)
-        a_C[idx] = float(C[i, j])
+    C = sp.coo_matrix(C)
+    elements_count = C.nnz
+    i_C = as_int_array(C.row + 1)
+    j_C = as_int_array(C.col + 1)
+    a_C = as_double_array(C.data)
 
     glpk.glp_load_matrix(lp, elements_count, i_C, j_C, a_C)
 
 
+def has_bulk_helpers():
+    '''Tells whether the swiglpk helpers `as_intArray` and `as_doubleArray`
+    copy their lists. Some releases, such as 5.0.13, wrap the Python
+    object itself instead of the array they fill, and read back garbage.'''
+    try:
+        return glpk.as_intArray([7])[1] == 7 \
+            and glpk.as_doubleArray([0.5])[1] == 0.5
+    except Exception:
+        return False
+
+
+HAS_BULK_HELPERS = has_bulk_helpers()
+
+
+def as_int_array(values):
+    '''Copies `values` into a new 1-based GLPK intArray in one step.'''
+    if HAS_BULK_HELPERS:
+        return glpk.as_intArray(np.asarray(values, dtype=np.int64).tolist())
+
+    array = glpk.intArray(1 + len(values))
+    view = array_view(array, ctypes.c_int, 1 + len(values))
+    view[0] = 0
+    view[1:] = values
+    return array
+
+
+def as_double_array(values):
+    '''Copies `values` into a new 1-based GLPK doubleArray in one step.'''
+    if HAS_BULK_HELPERS:
+        return glpk.as_doubleArray(
+            np.asarray(values, dtype=np.float64).tolist())
+
+    array = glpk.doubleArray(1 + len(values))
+    view = array_view(array, ctypes.c_double, 1 + len(values))
+    view[0] = 0
+    view[1:] = values
+    return array
+
+
+def array_view(array, c_type, size):
+    # swig arrays are plain C buffers, so NumPy can write into them directly;
+    # the address comes from the swig pointer, where the helpers are broken
+    buffer = (c_type * size).from_address(int(array.this))
+    return np.ctypeslib.as_array(buffer)
+
+
 def optimize(lp):
     glpk.glp_interior(lp, None)
 
 
 def get_primal_solution(lp, cols_count):
-    return [glpk.glp_ipt_col_prim(lp, i + 1) for i in range(cols_count)]
+    # swiglpk only reads the simplex solution in bulk (get_col_primals), so
+    # the interior one is read value by value, a fraction of a percent of
+    # the time of glp_interior
+    return np.fromiter(
+        (glpk.glp_ipt_col_prim(lp, j + 1) for j in range(cols_count)),
+        dtype=np.float64, count=cols_count)
 
 
 def get_dual_solution(lp, rows_count):
-    return [glpk.glp_ipt_row_dual(lp, j + 1) for j in range(rows_count)]
+    return np.fromiter(
+        (glpk.glp_ipt_row_dual(lp, i + 1) for i in range(rows_count)),
+        dtype=np.float64, count=rows_count)
 
 
 def get_cost(lp):
@@ -95,3 +154,217 @@ def get_cost(lp):
 
 def delete_problem(lp):
     glpk.glp_delete_prob(lp)
+
+
+def create_master_problem(c, C, d, signs=None, method='interior'):
+    '''Returns the master problem of the LP backend `method`, one of
+    `LP_METHODS`. Every backend has the same methods and records the time
+    of each `optimize` call in `optimize_times`.'''
+    if method == 'highs':
+        return HighsMasterProblem(c, C, d, signs)
+    if method in ('simplex', 'interior'):
+        return MasterProblem(c, C, d, signs, method)
+    raise ValueError(
+        f'Invalid LP method: {method}. Expected one of {LP_METHODS}.')
+
+
+def timed(optimize):
+    @functools.wraps(optimize)
+    def wrapper(self):
+        start = time.perf_counter()
+        try:
+            return optimize(self)
+        finally:
+            self.optimize_times += [time.perf_counter() - start]
+    return wrapper
+
+
+class MasterProblem:
+    '''GLPK problem kept alive during a whole column generation run.
+
+    New columns are appended in place instead of rebuilding the problem on
+    every iteration. With `method='simplex'` each call to `optimize` runs
+    the primal simplex from the basis left by the previous call, so its
+    cost depends on the new columns, not on the whole history. With
+    `method='interior'` the interior-point method is run from scratch on
+    the same problem, which gives central (non-vertex) duals.
+    '''
+
+    def __init__(self, c, C, d, signs=None, method='simplex'):
+        if method not in ('simplex', 'interior'):
+            raise ValueError(f'Invalid LP method: {method}')
+
+        self.method = method
+        self.lp = create_minimization_problem()
+        self.rows_count = set_rows(self.lp, d, signs)
+        self.cols_count = set_objective(self.lp, c)
+        set_coefficients(self.lp, C)
+
+        self.params = create_simplex_params()
+        glpk.glp_adv_basis(self.lp, 0)
+        self.optimize_times = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_column(self, coef, column):
+        self.cols_count += 1
+        j = self.cols_count
+        glpk.glp_add_cols(self.lp, 1)
+        glpk.glp_set_col_bnds(self.lp, j, glpk.GLP_LO, 0.0, 0.0)
+        glpk.glp_set_obj_coef(self.lp, j, coef)
+
+        rows, = np.nonzero(column)
+        i_col = as_int_array(rows + 1)
+        a_col = as_double_array(np.asarray(column, dtype=np.float64)[rows])
+        glpk.glp_set_mat_col(self.lp, j, len(rows), i_col, a_col)
+
+    def set_row(self, i, sign, value):
+        bnd_type, = get_bnd_types([sign], 1)
+        glpk.glp_set_row_bnds(self.lp, i + 1, bnd_type, value, value)
+
+    def set_objective(self, c):
+        for j, coef in enumerate(np.asarray(c, dtype=np.float64).tolist(), 1):
+            glpk.glp_set_obj_coef(self.lp, j, coef)
+
+    def fix_columns(self, columns, value):
+        for j in columns:
+            glpk.glp_set_col_bnds(self.lp, j + 1, glpk.GLP_FX, value, value)
+
+    def unfix_columns(self, columns):
+        for j in columns:
+            glpk.glp_set_col_bnds(self.lp, j + 1, glpk.GLP_LO, 0.0, 0.0)
+
+    @timed
+    def optimize(self):
+        if self.method == 'interior':
+            optimize(self.lp)
+            x = get_primal_solution(self.lp, self.cols_count)
+            y = get_dual_solution(self.lp, self.rows_count)
+            cost = get_cost(self.lp)
+            return LPSolution(x, y, cost)
+
+        status = glpk.glp_simplex(self.lp, self.params)
+        if status != 0:
+            # the previous basis could not be reused, so start a fresh one
+            glpk.glp_adv_basis(self.lp, 0)
+            status = glpk.glp_simplex(self.lp, self.params)
+
+        if status != 0:
+            raise RuntimeError(f'GLPK simplex failed with code {status}')
+
+        # the swiglpk helpers read the whole simplex solution in C
+        x = np.array(glpk.get_col_primals(self.lp))
+        y = np.array(glpk.get_row_duals(self.lp))
+        cost = glpk.glp_get_obj_val(self.lp)
+        return LPSolution(x, y, cost)
+
+    def close(self):
+        if self.lp is not None:
+            delete_problem(self.lp)
+            self.lp = None
+
+
+def create_simplex_params():
+    params = glpk.glp_smcp()
+    glpk.glp_init_smcp(params)
+    params.msg_lev = glpk.GLP_MSG_OFF
+    # the presolver discards the current basis, which prevents warm starts
+    params.presolve = glpk.GLP_OFF
+    return params
+
+
+class HighsMasterProblem:
+    '''Master problem solved by HiGHS through `scipy.optimize.linprog`.
+
+    scipy keeps no problem between calls, so the columns and bounds are
+    held here and every `optimize` solves the whole problem again, with no
+    warm start. HiGHS picks the dual simplex, so the duals are vertex ones,
+    like those of the GLPK simplex.
+    '''
+
+    def __init__(self, c, C, d, signs=None):
+        self.C = ColumnMatrix.from_sparse(C)
+        self.c = np.array(c, dtype=np.float64)
+        self.d = np.array(d, dtype=np.float64)
+        self.signs = ['=='] * len(self.d) if signs is None else list(signs)
+        get_sign_rows(self.signs)
+
+        self.lower = np.zeros(len(self.c))
+        self.upper = np.full(len(self.c), np.inf)
+        self.optimize_times = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_column(self, coef, column):
+        self.C.append_column(column)
+        self.c = np.append(self.c, coef)
+        self.lower = np.append(self.lower, 0.)
+        self.upper = np.append(self.upper, np.inf)
+
+    def set_row(self, i, sign, value):
+        get_sign_rows([sign])
+        self.signs[i] = sign
+        self.d[i] = value
+
+    def set_objective(self, c):
+        self.c[:] = c
+
+    def fix_columns(self, columns, value):
+        columns = list(columns)
+        self.lower[columns] = value
+        self.upper[columns] = value
+
+    def unfix_columns(self, columns):
+        columns = list(columns)
+        self.lower[columns] = 0.
+        self.upper[columns] = np.inf
+
+    @timed
+    def optimize(self):
+        C = self.C.tocsc().tocsr()
+        eq_rows, up_rows, lo_rows = get_sign_rows(self.signs)
+
+        # rows `>=` are negated into `<=` rows, and so are their duals
+        ub_rows = np.concatenate((up_rows, lo_rows))
+        ub_signs = np.concatenate((np.ones(len(up_rows)),
+                                   -np.ones(len(lo_rows))))
+        A_ub = sp.diags(ub_signs) @ C[ub_rows] if len(ub_rows) else None
+        b_ub = ub_signs * self.d[ub_rows] if len(ub_rows) else None
+        A_eq = C[eq_rows] if len(eq_rows) else None
+        b_eq = self.d[eq_rows] if len(eq_rows) else None
+
+        result = scipy.optimize.linprog(
+            self.c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq,
+            bounds=np.column_stack((self.lower, self.upper)),
+            method='highs')
+        if result.status != 0:
+            raise RuntimeError(f'HiGHS failed: {result.message}')
+
+        y = np.zeros(len(self.d))
+        if A_eq is not None:
+            y[eq_rows] = result.eqlin.marginals
+        if A_ub is not None:
+            y[ub_rows] = ub_signs * result.ineqlin.marginals
+        return LPSolution(np.array(result.x), y, result.fun)
+
+    def close(self):
+        pass
+
+
+def get_sign_rows(signs):
+    '''Returns the indexes of the `==`, `<=` and `>=` rows.'''
+    rows = {'==': [], '<=': [], '>=': []}
+    for i, sign in enumerate(signs):
+        if sign not in rows:
+            raise ValueError(f'Invalid sign: {sign}.')
+        rows[sign] += [i]
+    return tuple(np.array(rows[sign], dtype=int)
+                 for sign in ('==', '<=', '>='))
@@ -7,12 +7,15 @@ def parse(file: str):
     onto = owl.get_ontology(file)
     onto.load()
 
-    kb = get_kb(onto)
-    pbox_restrictions = pbox_parser.get_restrictions(onto)
+    pbox_ids, pbox_restrictions = pbox_parser.get_annotations(onto)
+    kb = get_kb(onto, pbox_ids)
     return kb, pbox_restrictions
 
 
-def get_kb(onto):
+def get_kb(onto, pbox_ids=None):
+    if pbox_ids is None:
+        pbox_ids, _ = pbox_parser.get_annotations(onto)
+
     owl_concepts = list(onto.classes())
     owl_individuals = list(onto.individuals())
     owl_roles = onto.object_properties()
@@ -25,7 +28,7 @@ def get_kb(onto):
 
     add_role_inclusions_from_roles(kb, owl_roles)
     owl_basic_concepts = [owl.Thing] + owl_concepts + owl_individuals
-    add_axioms_from_concepts(kb, owl_basic_concepts)
+    add_axioms_from_concepts(kb, owl_basic_concepts, pbox_ids)
     return kb
 
 
@@ -59,7 +62,7 @@ def add_role_inclusion(kb, owl_sub_role, owl_sup_role):
     kb.add_role_inclusion(owl_sub_role.iri, owl_sup_role.iri)
 
 
-def add_axioms_from_concepts(kb, owl_concepts):
+def add_axioms_from_concepts(kb, owl_concepts, pbox_ids):
     for sub_concept in owl_concepts:
         if sub_concept == owl.Nothing:
             continue
@@ -68,15 +71,16 @@ def add_axioms_from_concepts(kb, owl_concepts):
             # ignore trivial axioms
             if sup_concept == owl.Thing:
                 continue
-            add_axiom(kb, sub_concept, sup_concept)
+            add_axiom(kb, sub_concept, sup_concept, pbox_ids)
 
         for sup_concept in sub_concept.equivalent_to:
-            add_axiom(kb, sub_concept, sup_concept)
-            add_axiom(kb, sup_concept, sub_concept)
+            add_axiom(kb, sub_concept, sup_concept, pbox_ids)
+            add_axiom(kb, sup_concept, sub_concept, pbox_ids)
 
         if not is_concept(sub_concept):
             for sup_concept, role in get_individual_sup_and_role(sub_concept):
-                pbox_id = pbox_parser.get_id(sub_concept, sup_concept)
+                pbox_id = pbox_parser.get_id(pbox_ids, sub_concept,
+                                               sup_concept)
                 kb.add_axiom(
                     sub_concept.iri,
                     sup_concept.iri,
@@ -84,11 +88,12 @@ def add_axioms_from_concepts(kb, owl_concepts):
                     pbox_id)
 
 
-def add_axiom(kb, owl_sub_concept, owl_sup_concept):
+def add_axiom(kb, owl_sub_concept, owl_sup_concept, pbox_ids):
     sub_concept_iri = get_sub_concept_iri(kb, owl_sub_concept)
     sup_concept_iri = get_sup_concept_iri(owl_sup_concept)
     role_iri = get_role_iri(kb, owl_sup_concept)
-    pbox_id = pbox_parser.get_id(owl_sub_concept, owl_sup_concept)
+    pbox_id = pbox_parser.get_id(
+        pbox_ids, owl_sub_concept, owl_sup_concept)
 
     kb.add_axiom(sub_concept_iri, sup_concept_iri, role_iri, pbox_id)
 
@@ -128,11 +133,12 @@ def is_concept(owl_concept):
 
 
 def extract_role_iri(owl_existential_concept):
-    return type(owl_existential_concept.property()).iri
+    return owl_existential_concept.property.iri
 
 
 def extract_concept_iri(owl_existential_concept):
-    return type(owl_existential_concept.value()).iri
+    # calling the class would create an individual in the ontology
+    return owl_existential_concept.value.iri
 
 
 def get_individual_sup_and_role(owl_individual_concept):
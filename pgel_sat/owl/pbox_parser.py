@@ -4,58 +4,81 @@ PBOX_ID_HEADER = '#!pbox-id'
 PBOX_RESTRICTION_HEADER = '#!pbox-restriction'
 
 
-def get_id(owl_sub_concept, owl_sup_concept):
+def get_annotations(onto):
+    '''Reads every comment of `onto` once and returns the PBox ids of the
+    annotated subclass axioms, keyed by the storids of their sub and sup
+    concepts, and the PBox restrictions commented on owl:Thing.'''
+    sources = get_axiom_objects(onto, owl.owl_annotatedsource)
+    properties = get_axiom_objects(onto, owl.owl_annotatedproperty)
+    targets = get_axiom_objects(onto, owl.owl_annotatedtarget)
+
+    pbox_ids = {}
+    pbox_restrictions = []
+    for subject, _, raw_comment in onto.get_triples(None, owl.comment.storid,
+                                                     None):
+        comment = get_literal(raw_comment)
+        if subject == owl.Thing.storid:
+            pbox_restriction = parse_restriction(comment)
+            if pbox_restriction is not None:
+                pbox_restrictions += [pbox_restriction]
+        elif properties.get(subject) == owl.rdfs_subclassof:
+            pbox_id = parse_id(comment)
+            if pbox_id is not None:
+                # the first id of an axiom wins, as in a lookup of its comments
+                pbox_ids.setdefault((sources[subject], targets[subject]),
+                                    pbox_id)
+    return pbox_ids, pbox_restrictions
+
+
+def get_axiom_objects(onto, predicate):
+    return {subject: obj
+            for subject, _, obj in onto.get_triples(None, predicate, None)}
+
+
+def get_literal(raw_literal):
+    # the triples hold literals in their raw form, like "value"^^<type>
+    if raw_literal.startswith('"'):
+        return raw_literal[1:raw_literal.rindex('"')]
+    return raw_literal
+
+
+def get_id(pbox_ids, owl_sub_concept, owl_sup_concept):
     if is_existential(owl_sub_concept):
         return -1
-
-    comments = get_comments(owl_sub_concept, owl_sup_concept)
-    for comment in comments:
-        tokens = comment.split()
-        if len(tokens) > 1 and tokens[0] == PBOX_ID_HEADER:
-            return int(tokens[1])
-    return -1
+    return pbox_ids.get((owl_sub_concept.storid, owl_sup_concept.storid), -1)
 
 
 def is_existential(owl_concept):
     return isinstance(owl_concept, owl.class_construct.Restriction)
 
 
-def get_comments(owl_sub_concept, owl_sup_concept):
-    owl_is_a = owl.rdfs_subclassof
-    return owl.comment[owl_sub_concept, owl_is_a, owl_sup_concept]
+def parse_id(comment):
+    tokens = comment.split()
+    if len(tokens) > 1 and tokens[0] == PBOX_ID_HEADER:
+        return int(tokens[1])
+    return None
 
 
-def get_restrictions(onto):
-    def is_thing_comment(triple):
-        return triple[0] == owl.Thing.storid \
-            and triple[1] == owl.comment.storid
+def parse_restriction(comment):
+    comment_lines = comment.replace('\"', '').split('\n')
+    if comment_lines[0] != PBOX_RESTRICTION_HEADER:
+        return None
 
-    thing_comments = [triple for triple in onto.get_triples()
-                      if is_thing_comment(triple)]
+    restriction_raw_lines = comment_lines[1:]
+    axiom_restrictions = []
+    for raw_line in restriction_raw_lines[:-2]:
+        raw_line = raw_line.strip()
+        pbox_id, pbox_coef = raw_line.split()
+        pbox_id = int(pbox_id)
+        pbox_coef = float(pbox_coef)
+        axiom_restrictions += [(pbox_id, pbox_coef)]
 
-    pbox_restrictions = []
-    for comment in thing_comments:
-        comment_raw = comment[2]
-        comment_lines = comment_raw.replace('\"', '').split('\n')
-        if len(comment_lines) < 1:
-            continue
-
-        if comment_lines[0] != PBOX_RESTRICTION_HEADER:
-            continue
-
-        restriction_raw_lines = comment_lines[1:]
-        axiom_restrictions = []
-        for raw_line in restriction_raw_lines[:-2]:
-            raw_line = raw_line.strip()
-            pbox_id, pbox_coef = raw_line.split()
-            pbox_id = int(pbox_id)
-            pbox_coef = float(pbox_coef)
-            axiom_restrictions += [(pbox_id, pbox_coef)]
-
-        restriction_sign = restriction_raw_lines[-2].strip()
-        restriction_value = float(restriction_raw_lines[-1])
-
-        pbox_restrictions += [(axiom_restrictions,
-                               restriction_sign,
-                               restriction_value)]
+    restriction_sign = restriction_raw_lines[-2].strip()
+    restriction_value = float(restriction_raw_lines[-1])
+
+    return axiom_restrictions, restriction_sign, restriction_value
+
+
+def get_restrictions(onto):
+    _, pbox_restrictions = get_annotations(onto)
     return pbox_restrictions
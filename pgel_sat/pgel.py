@@ -1,9 +1,9 @@
 import numpy as np
 import scipy.sparse as sp
 import random
-from . import owl, gel
+from . import owl, gel, kb_cache
 
-EMPTY_MATRIX = np.empty((0, 0))
+EMPTY_MATRIX = sp.csr_matrix((0, 0))
 EMPTY_ARRAY = np.empty(0)
 
 
@@ -28,24 +28,50 @@ class ProbabilisticKnowledgeBase(gel.KnowledgeBase):
         self.signs = signs
 
     @classmethod
-    def from_file(cls, file):
+    def from_file(cls, file, cache_dir=None):
+        '''Reads the knowledge base of an OWL file.
+
+        With `cache_dir`, or the PGEL_SAT_CACHE_DIR environment variable,
+        the compiled KB is cached there, keyed by the file content, and
+        later reads of the same content skip the OWL parsing.
+        '''
+        cache_dir = kb_cache.get_cache_dir(cache_dir)
+        if cache_dir is None:
+            return cls.parse_file(file)
+
+        path = kb_cache.get_path(file, cache_dir)
+        kb = kb_cache.load(cls, path)
+        if kb is None:
+            kb = cls.parse_file(file)
+            kb_cache.store(kb, path)
+        return kb
+
+    @classmethod
+    def parse_file(cls, file):
         kb, pbox_restrictions = owl.parser.parse(file)
 
+        nonzeros_count = sum(len(axiom_restrictions)
+                             for axiom_restrictions, _, _ in pbox_restrictions)
+        rows = np.empty(nonzeros_count, dtype=int)
+        cols = np.empty(nonzeros_count, dtype=int)
+        data = np.empty(nonzeros_count)
+        b = np.empty(len(pbox_restrictions))
         signs = []
-        values = []
-        rows, cols, data = [], [], []
+
+        i = 0
         for row, pbox_restriction in enumerate(pbox_restrictions):
             axiom_restrictions, sign, value = pbox_restriction
-            for axiom_restriction in axiom_restrictions:
-                col, coefficient = axiom_restriction
-                rows += [row]
-                cols += [col]
-                data += [coefficient]
+            for col, coefficient in axiom_restrictions:
+                rows[i] = row
+                cols[i] = col
+                data[i] = coefficient
+                i += 1
+            b[row] = value
             signs += [sign]
-            values += [value]
 
-        A = sp.coo_matrix((data, (rows, cols))).todense()
-        b = np.array(values)
+        # the axioms are the columns up to the last one in a restriction
+        n = cols.max() + 1 if nonzeros_count > 0 else 0
+        A = sp.csr_matrix((data, (rows, cols)), shape=(len(b), n))
 
         kb.add_probabilistic_restrictions(A, b, signs)
 
@@ -69,7 +95,7 @@ class ProbabilisticKnowledgeBase(gel.KnowledgeBase):
             concepts_count, axioms_count, prob_axioms_count)
 
         prob_restrictions_count = prob_axioms_count
-        A = np.zeros((prob_restrictions_count, prob_axioms_count))
+        A = sp.identity(prob_axioms_count, format='csr')
 
         get_sign = {
             'lo': lambda: '<=',
@@ -81,7 +107,6 @@ class ProbabilisticKnowledgeBase(gel.KnowledgeBase):
         b = np.zeros(prob_restrictions_count)
         signs = []
         for i in range(prob_restrictions_count):
-            A[i, i] = 1
             signs += [get_sign()]
             b[i] = np.random.uniform(b_lo, b_hi)
 
@@ -1,77 +1,308 @@
 from math import isclose
 import numpy as np
+import scipy.sparse as sp
 from . import gel_max_sat
+from . import instrumentation
 from . import linprog
+from . import stabilization as stabilization_module
+from .column_pool import ColumnPool
+from .sparse import ColumnMatrix
 import time
 
 EPSILON = 1e-7
 TRACE = False
+PERTURBATION = 0.1
 
 
 def is_satisfiable(kb):
     return solve(kb)['satisfiable']
 
 
-def solve(kb):
-    C = initialize_C(kb)
-    c = initialize_c(kb)
-    d = initialize_d(kb)
-
-    signs = initialize_signs(kb)
-    trace(f'C:\n {C}')
-    trace(f'c: {c}')
-    trace(f'd: {d}')
-    trace(f'signs: {signs}')
-    lp = linprog.solve(c, C, d, signs)
-
-    trace(str_lp(lp))
-
-    i = 0
-    iteration_times = []
-    while not is_min_cost_zero(lp):
-        start = time.time()
-        trace(f'\n\niteration: {i}')
-        result = generate_column(kb, lp)
-        if not result['success']:
-            return {'satisfiable': False, 'iterations': i,
-                    'iteration_times': iteration_times}
-        trace(f'column {result["column"]}')
-
-        column = result['column']
-        C = np.column_stack((C, column))
-        c = np.append(c, 0)
-
-        lp = linprog.solve(c, C, d, signs)
-        trace(str_lp(lp))
-        i += 1
-        end = time.time()
-        iteration_times += [end - start]
-
-    assert_result(C @ lp.x, signs, d)
-    return {'satisfiable': True, 'lp': lp, 'iterations': i,
-            'iteration_times': iteration_times}
+def solve(kb, lp_method='interior', engine='edmonds-karp', pool=None,
+          max_columns=1, stabilization=None, on_iteration=None):
+    with Session(kb, lp_method, engine, pool, max_columns,
+                 stabilization, on_iteration) as session:
+        return session.solve()
+
+
+def get_probability_bounds(kb, pbox_id, lp_method='interior',
+                           engine='edmonds-karp', pool=None):
+    '''Returns the minimum and maximum probability of the axiom `pbox_id`
+    over the models of `kb`, or None when `kb` is unsatisfiable.'''
+    with Session(kb, lp_method, engine, pool) as session:
+        return session.get_probability_bounds(pbox_id)
+
+
+class Session:
+    '''Column generation state of a knowledge base, kept between solves.
+
+    The master problem, the columns generated so far and the compiled flow
+    network live as long as the session, so later solves on the same KB,
+    such as the two bounds of an axiom, start from the columns of the
+    earlier ones. `lp_method` is the LP backend of the master problem, one
+    of `linprog.LP_METHODS`.
+
+    `on_iteration`, when given, is called after every pricing with an
+    `instrumentation.IterationRecord`, such as by an
+    `instrumentation.Collector`. Without it nothing is timed or counted.
+    '''
+
+    def __init__(self, kb, lp_method='interior', engine='edmonds-karp',
+                 pool=None, max_columns=1, stabilization=None,
+                 on_iteration=None):
+        if max_columns < 1:
+            raise ValueError(
+                f'Invalid max columns: {max_columns}. Expected at least 1.')
+        if pool is None:
+            pool = ColumnPool(kb.n)
+        elif pool.n != kb.n:
+            raise ValueError(
+                f'Invalid column pool: {pool.n} axioms. Expected {kb.n}.')
+
+        self.kb = kb
+        self.engine = engine
+        self.pool = pool
+        self.max_columns = max_columns
+        self.on_iteration = on_iteration
+
+        self.C = initialize_C(kb)
+        self.c = initialize_c(kb)
+        self.d = initialize_d(kb)
+        self.signs = initialize_signs(kb)
+        self.stabilizer = stabilization_module.get_stabilizer(
+            stabilization, self.d)
+        trace('C:\n {}', self.C, format=str_matrix)
+        trace('c: {}', self.c)
+        trace('d: {}', self.d)
+        trace('signs: {}', self.signs)
+
+        self.template = gel_max_sat.NetworkTemplate(kb)
+        # refilled in place by every oracle call of the session
+        self.weighted_graph = self.template.weighted_graph(np.zeros(kb.n))
+        self.master = linprog.create_master_problem(
+            self.c, self.C.tocsc(), self.d, self.signs, lp_method)
+
+        self.in_master = set()
+        self.pool_hits = 0
+        self.rng = np.random.default_rng(0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.master.close()
+
+    def set_restriction(self, row, sign, value):
+        '''Changes the sign and the right-hand side of the PBox restriction
+        `row`, keeping the columns and the basis for the next solve, since
+        the worlds do not depend on the restrictions.'''
+        if not 0 <= row < self.kb.k:
+            raise ValueError(f'Invalid restriction: {row}.')
+
+        i = self.kb.n + row
+        self.kb.signs[row] = sign
+        self.kb.b[row] = value
+        self.signs[i] = sign
+        self.d[i] = value
+        self.master.set_row(i, sign, value)
+        if self.stabilizer is not None:
+            self.stabilizer.reset()
+
+    def add_pool_columns(self):
+        '''Adds the worlds of the pool missing from the master problem as
+        columns, so that the next solve starts from all of them, and
+        returns how many were added.'''
+        indexes = [index for index in range(len(self.pool))
+                   if index not in self.in_master]
+        for index in indexes:
+            column = world_column(self.kb, self.pool[index])
+            self.C.append_column(column)
+            self.master.add_column(0, column)
+        self.in_master.update(indexes)
+        return len(indexes)
+
+    @property
+    def artificial_columns(self):
+        return range(self.kb.n + self.kb.k + 1)
+
+    def probability_column(self, pbox_id):
+        return self.kb.n + self.kb.k + 1 + pbox_id
+
+    def solve(self):
+        '''Decides the satisfiability of the KB, minimizing the artificial
+        variables of the master problem.'''
+        optimize_count = len(self.master.optimize_times)
+        lp = self.master.optimize()
+        trace('{}', lp, format=str_lp)
+
+        lp, iteration_times = self.generate(lp, self.stabilizer)
+        result = {'iterations': len(iteration_times),
+                  'iteration_times': iteration_times,
+                  'lp_times': self.master.optimize_times[optimize_count:],
+                  'pool': self.pool, 'pool_hits': self.pool_hits}
+        if not is_min_cost_zero(lp):
+            return {'satisfiable': False, **result}
+
+        assert_result(self.C @ lp.x, self.signs, self.d)
+        return {'satisfiable': True, 'lp': lp, **result}
+
+    def get_probability_bounds(self, pbox_id):
+        if not 0 <= pbox_id < self.kb.n:
+            raise ValueError(f'Invalid PBox ID: {pbox_id}.')
+
+        if not self.solve()['satisfiable']:
+            return None
+        return (self.optimize_probability(pbox_id, 1),
+                self.optimize_probability(pbox_id, -1))
+
+    def optimize_probability(self, pbox_id, coef):
+        '''Returns the probability of the axiom `pbox_id` that minimizes
+        `coef` times it, starting from the feasible master left by `solve`:
+        the artificial variables are fixed at zero and the pricing goes on
+        until no column improves.
+        '''
+        column = self.probability_column(pbox_id)
+        objective = np.zeros(self.C.shape[1])
+        objective[column] = coef
+
+        self.master.set_objective(objective)
+        self.master.fix_columns(self.artificial_columns, 0)
+        try:
+            lp = self.master.optimize()
+            lp, _ = self.generate(lp, is_done=lambda lp: False)
+        finally:
+            self.master.set_objective(self.phase_one_objective())
+            self.master.unfix_columns(self.artificial_columns)
+        return max(0., min(float(lp.x[column]), 1.))
+
+    def phase_one_objective(self):
+        '''Returns the phase one objective over all the columns.'''
+        c = np.zeros(self.C.shape[1])
+        c[:len(self.c)] = self.c
+        return c
+
+    def generate(self, lp, stabilizer=None, is_done=None):
+        '''Adds improving columns and re-optimizes until `is_done`, by
+        default a zero cost, or no column improves, returning the last
+        solution and the time of each iteration.'''
+        if is_done is None:
+            is_done = is_min_cost_zero
+
+        is_recorded = self.on_iteration is not None
+        iteration_times = []
+        while not is_done(lp):
+            start = time.time()
+            trace('\n\niteration: {}', len(iteration_times))
+            flow_records = [] if is_recorded else None
+            result = price(self.kb, lp, self.engine, self.weighted_graph,
+                           self.pool, self.in_master, self.max_columns,
+                           self.rng, stabilizer,
+                           flow_records.append if is_recorded else None)
+            pricing_time = time.time() - start
+            if not result['success']:
+                if is_recorded:
+                    self.record_iteration(len(iteration_times), lp, lp,
+                                          result, pricing_time, flow_records)
+                break
+
+            for column in result['columns']:
+                trace('column {}', column)
+                self.C.append_column(column)
+                self.master.add_column(0, column)
+            self.in_master.update(result['pool_indexes'])
+            self.pool_hits += result['pool_hits']
+
+            priced_lp = lp
+            lp = self.master.optimize()
+            trace('{}', lp, format=str_lp)
+            end = time.time()
+            iteration_times += [end - start]
+            if is_recorded:
+                self.record_iteration(len(iteration_times) - 1, priced_lp,
+                                      lp, result, pricing_time, flow_records)
+        return lp, iteration_times
+
+    def record_iteration(self, iteration, priced_lp, lp, result,
+                         pricing_time, flow_records):
+        '''Reports an iteration to `on_iteration`: `priced_lp` gave the
+        duals of the pricing and `lp` is the master solved afterwards,
+        the same one when no column was added.'''
+        columns = result.get('columns', [])
+        duals = get_weights(priced_lp)
+        reduced_cost = None
+        if len(columns) > 0:
+            # the world columns cost nothing in the objective
+            reduced_cost = -max(float(duals @ column) for column in columns)
+
+        def flow_sum(field):
+            return instrumentation.sum_flow_records(flow_records, field)
+
+        self.on_iteration(instrumentation.IterationRecord(
+            iteration=iteration,
+            lp_time=self.master.optimize_times[-1] if lp is not priced_lp
+            else 0.,
+            pricing_time=pricing_time,
+            graph_time=flow_sum('graph_time') or 0.,
+            flow_time=flow_sum('flow_time') or 0.,
+            oracle_calls=len(flow_records),
+            augmenting_paths=flow_sum('augmenting_paths'),
+            visited_vertices=flow_sum('visited_vertices'),
+            reduced_cost=reduced_cost,
+            cost=lp.cost,
+            columns_added=len(columns),
+            columns_count=self.C.shape[1],
+            pool_hits=result.get('pool_hits', 0)))
 
 
 def initialize_C(kb):
-    C_left = np.identity(kb.n + kb.k + 1)
-
-    C_right = np.vstack((
-        - np.identity(kb.n),
-        kb.A,
-        np.zeros(kb.n)
-    ))
-
-    return np.hstack((C_left, C_right))
+    '''Returns the initial columns [I | -I; A; 0], the artificial columns
+    followed by the columns of the probabilities, written straight into
+    CSC arrays so that building them costs memory in the nonzeros only.'''
+    rows_count = kb.n + kb.k + 1
+    A = sp.csc_matrix(kb.A)
+    A.sort_indices()
+    nonzeros_count = rows_count + kb.n + A.nnz
+
+    indptr = np.empty(rows_count + kb.n + 1, dtype=np.int64)
+    indices = np.empty(nonzeros_count, dtype=np.int32)
+    data = np.empty(nonzeros_count)
+
+    # the artificial column i has its single 1 in row i
+    indptr[:rows_count + 1] = np.arange(rows_count + 1)
+    indices[:rows_count] = np.arange(rows_count)
+    data[:rows_count] = 1
+
+    # the column of the probability i has -1 in row i, then the column i of
+    # A shifted below the n first rows
+    axioms = np.arange(kb.n)
+    indptr[rows_count + 1:] = rows_count + axioms + 1 + A.indptr[1:]
+    starts = indptr[rows_count:-1]
+    indices[starts] = axioms
+    data[starts] = -1
+
+    A_axioms = np.repeat(axioms, np.diff(A.indptr))
+    A_positions = rows_count + A_axioms + 1 + np.arange(A.nnz)
+    indices[A_positions] = kb.n + A.indices
+    data[A_positions] = A.data
+
+    return ColumnMatrix.from_sparse(sp.csc_matrix(
+        (data, indices, indptr), shape=(rows_count, rows_count + kb.n)))
 
 
 def initialize_c(kb):
-    c_left = np.ones(kb.n + kb.k + 1)
-    c_right = np.zeros(kb.n)
-    return np.hstack((c_left, c_right))
+    c = np.zeros(2 * kb.n + kb.k + 1)
+    c[:kb.n + kb.k + 1] = 1
+    return c
 
 
 def initialize_d(kb):
-    return np.hstack((np.zeros(kb.n), kb.b, 1))
+    d = np.zeros(kb.n + kb.k + 1)
+    d[kb.n:-1] = kb.b
+    d[-1] = 1
+    return d
 
 
 def initialize_signs(kb):
@@ -86,20 +317,139 @@ def get_weights(lp):
     return np.array(lp.y)
 
 
-def generate_column(kb, lp):
-    weights = get_weights(lp)
-    trace(f'weights {weights}')
-
-    result = gel_max_sat.solve(kb, weights[:kb.n])
+def price(kb, lp, engine='edmonds-karp', template=None, pool=None,
+          in_master=(), max_columns=1, rng=None, stabilizer=None,
+          on_flow=None):
+    '''Generates the columns of one iteration, pricing with the weights of
+    `stabilizer` until they give an improving column or equal the duals.
+    `template` is passed on to the oracle, `gel_max_sat.solve`, which also
+    takes a `WeightedGraph` to refill. `on_flow` gets the `gel_max_sat.FlowRecord` of every oracle call.'''
+    if stabilizer is None:
+        return generate_columns(
+            kb, lp, engine, template, pool, in_master, max_columns, rng,
+            on_flow=on_flow)
+
+    stabilizer.start(get_weights(lp))
+    while True:
+        weights = stabilizer.weights()
+        result = generate_columns(kb, lp, engine, template, pool, in_master,
+                                  max_columns, rng, weights, on_flow)
+        if result.get('value') is not None:
+            stabilizer.update(weights, result['value'])
+
+        if result['success'] or stabilizer.is_exact(weights):
+            stabilizer.finish(stabilizer.step > 0)
+            return result
+        trace('mis-pricing {}', stabilizer.step)
+        stabilizer.mispriced()
+
+
+def generate_column(kb, lp, engine='edmonds-karp', template=None,
+                    pool=None, in_master=(), weights=None, on_flow=None):
+    '''Prices one improving column with `weights`, the duals of `lp` by
+    default. The column must improve for the duals of `lp` in any case;
+    the pricing value of the oracle world is returned under `value`.'''
+    duals = get_weights(lp)
+    weights = duals if weights is None else weights
+    trace('weights {}', weights)
+
+    if pool is not None:
+        # the columns already in the master are never improving, and a
+        # world stored by an earlier solve is as good as a fresh one
+        index, _ = pool.best(weights[:kb.n], in_master)
+        if index is not None:
+            column = world_column(kb, pool[index])
+            if is_improving(duals, column):
+                return {'success': True, 'pool_hit': True,
+                        'pool_index': index, 'column': column}
+
+    result = gel_max_sat.solve(kb, weights[:kb.n], engine, template, on_flow)
 
     if not result['success']:
         return {'success': False}
 
     column = extract_column(kb, result)
-    if weights @ column < 0:
+    value = weights @ column
+    if not is_improving(duals, column):
+        return {'success': False, 'value': value}
+
+    index = pool.add(column[:kb.n]) if pool is not None else None
+    return {'success': True, 'pool_hit': False, 'pool_index': index,
+            'column': column, 'value': value}
+
+
+def generate_columns(kb, lp, engine='edmonds-karp', template=None,
+                     pool=None, in_master=(), max_columns=1, rng=None,
+                     weights=None, on_flow=None):
+    '''Prices up to `max_columns` distinct improving columns at once.
+
+    The improving worlds of the pool come first. Without any, the oracle
+    is asked for both extreme minimum cuts and then for minimum cuts under
+    randomly perturbed weights, keeping the cuts improving for the duals
+    of `lp`. A single column is found exactly as by `generate_column`.
+    '''
+    if max_columns == 1 or pool is None:
+        result = generate_column(
+            kb, lp, engine, template, pool, in_master, weights, on_flow)
+        if not result['success']:
+            return result
+        return {'success': True, 'columns': [result['column']],
+                'pool_indexes': [result['pool_index']],
+                'pool_hits': int(result['pool_hit']),
+                'value': result.get('value')}
+
+    duals = get_weights(lp)
+    weights = duals if weights is None else weights
+    trace('weights {}', weights)
+
+    indexes, _ = pool.top(weights[:kb.n], max_columns, in_master)
+    indexes = [j for j in indexes.tolist()
+               if is_improving(duals, world_column(kb, pool[j]))]
+    if len(indexes) > 0:
+        return {'success': True, 'pool_indexes': indexes,
+                'pool_hits': len(indexes),
+                'columns': [world_column(kb, pool[j]) for j in indexes]}
+
+    result = gel_max_sat.solve_cuts(kb, weights[:kb.n], engine, template,
+                                    on_flow)
+    if not result['success']:
         return {'success': False}
 
-    return {'success': True, 'column': column}
+    if rng is None:
+        rng = np.random.default_rng()
+
+    columns = []
+    cuts = result['cuts']
+    value = weights @ extract_column(kb, {'prob_axiom_indexes': cuts[0]})
+    for _ in range(max_columns):
+        for cut in cuts:
+            column = extract_column(kb, {'prob_axiom_indexes': cut})
+            if len(columns) < max_columns \
+                    and column[:kb.n] not in pool \
+                    and is_improving(duals, column):
+                indexes += [pool.add(column[:kb.n])]
+                columns += [column]
+
+        if len(columns) == max_columns:
+            break
+
+        # additive, so that the axioms priced at zero are moved as well
+        scale = PERTURBATION * max(np.abs(weights).max(), EPSILON)
+        perturbed = weights[:kb.n] + rng.uniform(-scale, scale, kb.n)
+        result = gel_max_sat.solve_cuts(kb, perturbed, engine, template,
+                                        on_flow)
+        cuts = result['cuts'] if result['success'] else []
+
+    if len(columns) == 0:
+        return {'success': False, 'value': value}
+    return {'success': True, 'columns': columns, 'pool_indexes': indexes,
+            'pool_hits': 0, 'value': value}
+
+
+def is_improving(weights, column):
+    # vertex duals price the columns already in the basis at exactly zero,
+    # so only a strictly positive value can lower the cost
+    return weights @ column > EPSILON
 
 
 def extract_column(kb, result):
@@ -107,8 +457,11 @@ def extract_column(kb, result):
     for prob_axiom_index in result['prob_axiom_indexes']:
         m_column[prob_axiom_index] = 0
 
-    column = np.hstack((m_column, np.zeros(kb.k), 1))
-    return column
+    return world_column(kb, m_column)
+
+
+def world_column(kb, world):
+    return np.hstack((world, np.zeros(kb.k), 1))
 
 
 def assert_result(product, signs, d):
@@ -119,6 +472,10 @@ def assert_result(product, signs, d):
             assert value > d[i] - EPSILON/2
 
 
+def str_matrix(C):
+    return str(C.tocsc().toarray())
+
+
 def str_lp(lp):
     return f'''lp solution:
     x: {lp.x}
@@ -126,6 +483,8 @@ def str_lp(lp):
     cost: {lp.cost}'''
 
 
-def trace(string):
+def trace(string, *values, format=str):
+    # the values are only formatted when tracing, since printing large
+    # arrays costs more than a whole iteration
     if TRACE:
-        print(string)
+        print(string.format(*map(format, values)))
@@ -0,0 +1,94 @@
+import numpy as np
+import scipy.sparse as sp
+
+INITIAL_CAPACITY = 16
+
+
+class ColumnMatrix:
+    '''Sparse matrix stored by columns (CSC) in preallocated arrays.
+
+    The index and value arrays grow geometrically, so appending a column
+    costs time proportional to its nonzeros instead of copying the whole
+    matrix as `np.column_stack` does.
+    '''
+
+    def __init__(self, rows_count, cols_capacity=INITIAL_CAPACITY,
+                 nonzeros_capacity=INITIAL_CAPACITY):
+        self.rows_count = rows_count
+        self.cols_count = 0
+        self.nonzeros_count = 0
+
+        self.indptr = np.zeros(max(cols_capacity, 1) + 1, dtype=np.int64)
+        self.indices = np.empty(max(nonzeros_capacity, 1), dtype=np.int32)
+        self.data = np.empty(max(nonzeros_capacity, 1), dtype=np.float64)
+
+    @classmethod
+    def from_sparse(cls, matrix):
+        matrix = sp.csc_matrix(matrix)
+        matrix.sort_indices()
+        rows_count, cols_count = matrix.shape
+        nonzeros_count = matrix.nnz
+
+        C = cls(rows_count, 2 * cols_count, 2 * nonzeros_count)
+        C.indptr[:cols_count + 1] = matrix.indptr
+        C.indices[:nonzeros_count] = matrix.indices
+        C.data[:nonzeros_count] = matrix.data
+        C.cols_count = cols_count
+        C.nonzeros_count = nonzeros_count
+        return C
+
+    @property
+    def shape(self):
+        return (self.rows_count, self.cols_count)
+
+    def append_column(self, column):
+        column = np.asarray(column, dtype=np.float64)
+        if column.shape != (self.rows_count,):
+            raise ValueError(
+                f'Invalid column shape: {column.shape}. ' +
+                f'Expected ({self.rows_count},).')
+
+        rows, = np.nonzero(column)
+        self.reserve(1, len(rows))
+
+        start = self.nonzeros_count
+        end = start + len(rows)
+        self.indices[start:end] = rows
+        self.data[start:end] = column[rows]
+
+        self.cols_count += 1
+        self.nonzeros_count = end
+        self.indptr[self.cols_count] = end
+
+    def reserve(self, cols_count, nonzeros_count):
+        required_cols = self.cols_count + cols_count + 1
+        if required_cols > len(self.indptr):
+            self.indptr = grow(self.indptr, required_cols)
+
+        required_nonzeros = self.nonzeros_count + nonzeros_count
+        if required_nonzeros > len(self.indices):
+            self.indices = grow(self.indices, required_nonzeros)
+            self.data = grow(self.data, required_nonzeros)
+
+    def tocsc(self):
+        '''Returns a scipy view over the stored arrays, without copying.'''
+        return sp.csc_matrix(
+            (self.data[:self.nonzeros_count],
+             self.indices[:self.nonzeros_count],
+             self.indptr[:self.cols_count + 1]),
+            shape=self.shape,
+            copy=False)
+
+    def __matmul__(self, x):
+        return self.tocsc() @ np.asarray(x)
+
+    def __repr__(self):
+        return f'ColumnMatrix(shape={self.shape}, ' \
+            + f'nonzeros={self.nonzeros_count})'
+
+
+def grow(array, required_size):
+    size = max(required_size, 2 * len(array))
+    new_array = np.empty(size, dtype=array.dtype)
+    new_array[:len(array)] = array
+    return new_array
@@ -0,0 +1,124 @@
+import numpy as np
+
+
+def get_stabilizer(stabilization, d):
+    '''Returns a new stabilizer named `stabilization` for a master problem
+    with right-hand side `d`, or None when `stabilization` is None.'''
+    if stabilization is None or isinstance(stabilization, Stabilizer):
+        return stabilization
+    if stabilization not in STABILIZATIONS:
+        raise ValueError(
+            f'Invalid stabilization: {stabilization}. ' +
+            f'Choose one of: {", ".join(STABILIZATIONS)}.')
+    return STABILIZATIONS[stabilization](d)
+
+
+class Stabilizer:
+    '''Chooses the weights used for pricing instead of the raw LP duals.
+
+    The weights are taken between the LP duals and a stability center, the
+    duals with the best Lagrangian bound found so far,
+
+        LB(y) = y @ d - max(0, max(y @ column)),
+
+    valid because the world columns of the master add up to at most 1.
+    When the column priced with the weights does not improve for the LP
+    duals (a mis-pricing), `mispriced` moves the weights towards the duals,
+    reaching them after a finite number of steps, so a KB is only declared
+    unsatisfiable by an exact pricing.
+    '''
+
+    def __init__(self, d):
+        self.d = np.asarray(d, dtype=np.float64)
+        self.duals = None
+        self.step = 0
+        self.reset()
+
+    def reset(self):
+        '''Forgets the center, whose bound is stale once `d` changes.'''
+        self.center = None
+        self.center_bound = -np.inf
+
+    def start(self, duals):
+        '''Starts a pricing round for new LP duals.'''
+        self.duals = np.asarray(duals, dtype=np.float64)
+        self.step = 0
+
+    def weights(self):
+        if self.center is None:
+            return self.duals
+        return self.separation_point()
+
+    def separation_point(self):
+        '''Returns the weights given the center. The base class does not
+        stabilize, so they are the duals.'''
+        return self.duals
+
+    def is_exact(self, weights):
+        return np.array_equal(weights, self.duals)
+
+    def update(self, weights, value):
+        '''Moves the center to `weights` when their bound is the best yet,
+        `value` being the maximum of `weights @ column` over the worlds.'''
+        bound = weights @ self.d - max(0, value)
+        if bound > self.center_bound:
+            self.center = np.array(weights)
+            self.center_bound = bound
+
+    def mispriced(self):
+        self.step += 1
+
+    def finish(self, mispriced):
+        '''Ends a pricing round, `mispriced` telling if it ever failed.'''
+
+
+class Wentges(Stabilizer):
+    '''Smoothing `alpha * center + (1 - alpha) * duals`, with the weight of
+    the center reduced by `1 - alpha` on every mis-pricing of a round.'''
+
+    def __init__(self, d, alpha=0.5):
+        super().__init__(d)
+        self.alpha = alpha
+
+    def separation_point(self):
+        alpha = max(0, 1 - (self.step + 1) * (1 - self.alpha))
+        if alpha == 0:
+            return self.duals
+        return alpha * self.center + (1 - alpha) * self.duals
+
+
+class InOut(Wentges):
+    '''In-out separation: Wentges smoothing with an adaptive `alpha`, which
+    grows after rounds priced at once and halves after mis-pricings.'''
+
+    def __init__(self, d, alpha=0.5, max_alpha=0.9):
+        super().__init__(d, alpha)
+        self.max_alpha = max_alpha
+
+    def finish(self, mispriced):
+        if mispriced:
+            self.alpha /= 2
+        else:
+            self.alpha = min(self.max_alpha,
+                             self.alpha + (1 - self.alpha) / 10)
+
+
+class BoxStep(Stabilizer):
+    '''Projects the duals onto a box of half-width `width` around the
+    center, doubling the width on every mis-pricing of a round until the
+    box holds the duals.'''
+
+    def __init__(self, d, width=0.1):
+        super().__init__(d)
+        self.width = width
+
+    def separation_point(self):
+        width = self.width * 2 ** self.step
+        return np.clip(self.duals, self.center - width, self.center + width)
+
+
+STABILIZATIONS = {
+    'wentges': Wentges,
+    'box-step': BoxStep,
+    'in-out': InOut,
+}
@@ -43,3 +43,35 @@ def test_same_values_arrow_equal(concept_with_arrows):
 def test_concept_has_name(concept_with_arrows):
     concept, _ = concept_with_arrows
     assert concept.name == 'a'
+
+
+@pytest.fixture
+def deep_chain():
+    is_a = gel.roles.IsA()
+    concepts = [gel.Concept(i) for i in range(20000)]
+    for sub_concept, sup_concept in zip(concepts, concepts[1:]):
+        sub_concept.add_arrow(gel.Arrow(sup_concept, is_a))
+    return concepts
+
+
+def test_concept_sup_concepts_reached_deep_chain(deep_chain):
+    assert list(deep_chain[0].sup_concepts_reached()) == deep_chain
+
+
+def test_concept_sub_concepts_reach_deep_chain(deep_chain):
+    assert list(deep_chain[-1].sub_concepts_reach()) == deep_chain[::-1]
+
+
+def test_concept_is_empty_deep_chain(deep_chain):
+    assert not deep_chain[0].is_empty()
+
+    empty_concept = gel.concepts.EmptyConcept('bot')
+    deep_chain[-1].add_arrow(gel.Arrow(empty_concept, gel.roles.IsA()))
+    assert deep_chain[0].is_empty()
+
+
+def test_concept_without_arrows_shares_empty_sets():
+    concept_a = gel.Concept('a')
+    concept_b = gel.Concept('b')
+    assert concept_a.sup_arrows is concept_b.sub_arrows
+    assert not hasattr(concept_a, '__dict__')
@@ -1,3 +1,5 @@
+import pickle
+import sys
 import pytest
 from pgel_sat import gel
 
@@ -166,6 +168,28 @@ def test_graph_add_axiom():
     assert not graph.add_axiom('C', 'D', graph.is_a)
 
 
+def test_graph_remove_axiom(init_bot_graph):
+    graph = init_bot_graph
+    assert graph.has_path_init_to_bot
+
+    assert not graph.remove_axiom('C', 'bot', graph.is_a.iri, pbox_id=0)
+    assert graph.remove_axiom('C', 'bot', graph.is_a.iri)
+    assert not graph.remove_axiom('C', 'bot', graph.is_a.iri)
+    assert not graph.has_path_init_to_bot
+    assert graph.add_axiom('C', 'bot', graph.is_a.iri)
+
+
+def test_graph_remove_pbox_axiom():
+    graph = gel.KnowledgeBase('bot', 'top')
+    graph.add_concept(gel.Concept('C'))
+    graph.add_concept(gel.Concept('D'))
+    graph.add_axiom('C', 'D', graph.is_a, pbox_id=0)
+
+    assert graph.remove_axiom('C', 'D', graph.is_a, pbox_id=0)
+    assert graph.pbox_axioms == {}
+    assert graph.is_a.axioms == []
+
+
 def test_graph_fix_existential_head_axiom(simple_graph):
     concept_d = gel.Concept('D')
     simple_graph.add_concept(concept_d)
@@ -198,3 +222,50 @@ def test_graph_can_handle_multiple_completions():
                                      axioms_count=1000,
                                      uncertain_axioms_count=40,
                                      roles_count=10)
+
+
+def test_knowledge_base_pickle_round_trip(simple_graph):
+    copy = pickle.loads(pickle.dumps(simple_graph))
+
+    assert [c.iri for c in copy.concepts] == \
+        [c.iri for c in simple_graph.concepts]
+    assert [r.iri for r in copy.roles] == [r.iri for r in simple_graph.roles]
+    for concept in simple_graph.concepts:
+        arrows = {(a.concept.iri, a.role.iri, a.pbox_id)
+                  for a in concept.sup_arrows}
+        copied = copy.get_concept(concept.iri)
+        assert {(a.concept.iri, a.role.iri, a.pbox_id)
+                for a in copied.sup_arrows} == arrows
+        assert type(copied) is type(concept)
+    assert [c.id for c in copy.concepts] == \
+        [c.id for c in simple_graph.concepts]
+
+
+def test_graph_ids_are_dense_per_knowledge_base(simple_graph,
+                                                three_concept_graph):
+    for graph in [simple_graph, three_concept_graph]:
+        assert [c.id for c in graph.concepts] == \
+            list(range(len(graph.concepts)))
+        assert [r.id for r in graph.roles] == list(range(len(graph.roles)))
+
+
+def test_graph_replaced_concept_keeps_id(three_concept_graph):
+    concept_id = three_concept_graph.get_concept('D').id
+    three_concept_graph.add_concept(gel.Concept('D'))
+    assert three_concept_graph.get_concept('D').id == concept_id
+
+
+def test_graph_arrows_hash_integer_ids(simple_graph):
+    for concept in simple_graph.concepts:
+        for arrow in concept.sup_arrows:
+            assert hash(arrow) == hash((arrow.concept.id, arrow.role.id))
+
+
+def test_graph_objects_are_compact(simple_graph):
+    concept = simple_graph.get_concept('C')
+    arrow = next(iter(simple_graph.init.sup_arrows))
+    for entity in [concept, simple_graph.is_a, arrow]:
+        assert not hasattr(entity, '__dict__')
+    assert sys.getsizeof(concept) <= 72
+    assert sys.getsizeof(simple_graph.is_a) <= 56
+    assert sys.getsizeof(arrow) <= 64
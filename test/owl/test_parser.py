@@ -0,0 +1,14 @@
+import owlready2 as owl
+
+from pgel_sat.owl import parser
+
+
+def test_get_kb_leaves_the_ontology_unchanged():
+    onto = owl.get_ontology('./data/example.owl')
+    onto.load()
+    individuals = list(onto.individuals())
+
+    kb = parser.get_kb(onto)
+
+    assert list(onto.individuals()) == individuals
+    assert len(parser.get_kb(onto).concepts) == len(kb.concepts)
@@ -0,0 +1,31 @@
+import owlready2 as owl
+import pytest
+
+from pgel_sat.owl import pbox_parser
+
+
+@pytest.fixture()
+def onto():
+    onto = owl.get_ontology('./data/example.owl')
+    onto.load()
+    return onto
+
+
+def test_get_annotations(onto):
+    pbox_ids, pbox_restrictions = pbox_parser.get_annotations(onto)
+
+    assert pbox_parser.get_id(pbox_ids, onto.Dengue, owl.Nothing) == 2
+    fever_cause = onto.Fever.is_a[1]
+    assert pbox_parser.get_id(pbox_ids, onto.Fever, fever_cause) == 0
+    assert pbox_parser.get_id(pbox_ids, onto.Fever, onto.Symptom) == -1
+    assert sorted(pbox_ids.values()) == [0, 1, 2]
+
+    assert pbox_restrictions == [([(0, -1.), (1, 1.)], '==', 0.05),
+                                 ([(2, 1.)], '==', 0.7)]
+
+
+def test_get_literal():
+    raw_literal = '"#!pbox-id 3"^^<http://www.w3.org/2001/XMLSchema#string>'
+    assert pbox_parser.get_literal(raw_literal) == '#!pbox-id 3'
+    assert pbox_parser.get_literal('"a\nb"@en') == 'a\nb'
+    assert pbox_parser.get_literal('#!pbox-id 3') == '#!pbox-id 3'
@@ -0,0 +1,141 @@
+import os
+import random
+import signal
+import time
+from pgel_sat import ProbabilisticKnowledgeBase, solve, solve_many
+from pgel_sat import batch, solve_as_completed
+import numpy as np
+import pytest
+
+
+class CrashingKnowledgeBase(ProbabilisticKnowledgeBase):
+    def __setstate__(self, state):
+        os._exit(1)
+
+
+class FlakyKnowledgeBase(ProbabilisticKnowledgeBase):
+    '''Crashes its worker the first time only, leaving a marker file.'''
+
+    def __setstate__(self, state):
+        marker = state[1]['marker']
+        if not os.path.exists(marker):
+            open(marker, 'w').close()
+            os._exit(1)
+        super().__setstate__(state)
+
+
+class StuckKnowledgeBase(ProbabilisticKnowledgeBase):
+    '''Hangs where no signal reaches it, like a native solver call.'''
+
+    def __setstate__(self, state):
+        signal.pthread_sigmask(signal.SIG_BLOCK, [signal.SIGALRM])
+        time.sleep(60)
+
+
+@pytest.fixture()
+def kbs():
+    kbs = []
+    for seed in range(6):
+        random.seed(seed)
+        np.random.seed(seed)
+        kbs += [ProbabilisticKnowledgeBase.random(
+            20, 40, 10, 2, 10, -1, 1, 0, 1, 'all', 3)]
+    return kbs
+
+
+def test_solve_many_keeps_submission_order(kbs):
+    results = solve_many(kbs, workers=2)
+    for kb, result in zip(kbs, results):
+        expected = solve(kb)
+        assert result['satisfiable'] == expected['satisfiable']
+        assert result['iterations'] == expected['iterations']
+
+
+def test_solve_as_completed_yields_every_kb(kbs):
+    indexes = [index for index, _ in solve_as_completed(kbs, workers=2)]
+    assert sorted(indexes) == list(range(len(kbs)))
+
+
+def test_solve_many_reports_errors(kbs):
+    kbs[1].signs = ['=>'] * len(kbs[1].signs)
+    results = solve_many(kbs, workers=2)
+
+    assert results[1]['satisfiable'] is None
+    assert 'error' in results[1]
+    assert all('error' not in result
+               for i, result in enumerate(results) if i != 1)
+
+
+def test_solve_many_survives_crashed_worker(kbs):
+    kbs[2] = CrashingKnowledgeBase('bot', 'top')
+    results = solve_many(kbs, workers=2)
+
+    assert results[2]['error'] == 'Worker crashed'
+    assert all(result['satisfiable'] is not None
+               for i, result in enumerate(results) if i != 2)
+
+
+def test_solve_many_retries_crashed_task(kbs, tmp_path):
+    kb = FlakyKnowledgeBase('bot', 'top')
+    kb.marker = str(tmp_path / 'crashed')
+    results = solve_many([kb, *kbs], workers=2)
+
+    assert os.path.exists(kb.marker)
+    assert all(result['satisfiable'] is not None for result in results)
+
+
+def test_solve_many_reports_unpicklable_kb(kbs):
+    kb = ProbabilisticKnowledgeBase('bot', 'top')
+    kb.hook = lambda: 0
+    result, = solve_many([kb], workers=1, timeout=30)
+    assert 'pickle' in result['error']
+
+    results = solve_many([kb, *kbs], workers=2)
+    assert results[0]['satisfiable'] is None
+    assert all(result['satisfiable'] is not None for result in results[1:])
+
+
+def test_solve_many_retries_task_of_worker_crashed_starting(
+        kbs, tmp_path, monkeypatch):
+    marker = tmp_path / 'crashed'
+    warm_up = batch.warm_up
+
+    def crash_once():
+        if not marker.exists():
+            marker.touch()
+            os._exit(1)
+        warm_up()
+
+    monkeypatch.setattr(batch, 'warm_up', crash_once)
+    results = solve_many(kbs, workers=1)
+
+    assert marker.exists()
+    assert all(result['satisfiable'] is not None for result in results)
+
+
+def test_solve_many_fails_tasks_when_workers_cannot_start(kbs, monkeypatch):
+    monkeypatch.setattr(batch, 'warm_up', lambda: os._exit(1))
+    results = solve_many(kbs[:2], workers=2)
+
+    assert all(result['error'] == 'Worker crashed' for result in results)
+
+
+def test_solve_many_times_out():
+    random.seed(0)
+    np.random.seed(0)
+    kb = ProbabilisticKnowledgeBase.random(
+        300, 150, 150, 2, 10, -1, 1, 0, 1, 'lo', 3)
+
+    result, = solve_many([kb], workers=1, timeout=1e-3)
+    assert result['satisfiable'] is None
+    assert result['error'].startswith('Timeout')
+
+
+def test_solve_many_terminates_stuck_worker(kbs):
+    start = time.monotonic()
+    results = solve_many([StuckKnowledgeBase('bot', 'top'), *kbs],
+                         workers=2, timeout=1)
+
+    assert time.monotonic() - start < 30
+    assert results[0]['error'].startswith('Timeout')
+    assert all(result['satisfiable'] is not None for result in results[1:])
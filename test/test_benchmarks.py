@@ -0,0 +1,55 @@
+import json
+import os
+
+import pytest
+
+import benchmarks
+
+# the stored baseline comes from one machine, so the times are only
+# checked against it when asked for, on that machine or a comparable one;
+# the suite then fails on clear regressions only, `benchmarks.py` checking
+# against the tighter default
+TEST_THRESHOLD = 2.
+
+
+def test_benchmarks_report_every_stage():
+    report = benchmarks.run_benchmarks(['example', 'small'], repeat=1)
+
+    assert set(report['results']) == {
+        f'{case}/{stage}' for case in ['example', 'small']
+        for stage in benchmarks.STAGES}
+    for times in report['results'].values():
+        assert len(times['times']) == 1
+        assert times['min'] == times['median'] == times['times'][0]
+    assert json.loads(json.dumps(report)) == report
+
+
+def test_find_regressions():
+    def report(**results):
+        return {'results': {key: {'min': time}
+                            for key, time in results.items()}}
+
+    baseline = report(graph=0.010, solve=0.100, noise=0.0001)
+    current = report(graph=0.011, solve=0.200, noise=0.0005, new=1.0)
+
+    assert benchmarks.find_regressions(current, baseline) == [('solve', 2)]
+    assert benchmarks.find_regressions(current, None) == []
+
+
+def test_baseline_covers_every_stage():
+    baseline = benchmarks.load_report(benchmarks.BASELINE_FILE)
+
+    assert set(baseline['results']) == {
+        f'{case}/{stage}' for case in benchmarks.CASES
+        for stage in benchmarks.STAGES}
+
+
+@pytest.mark.skipif(not os.environ.get('PGEL_SAT_BENCHMARKS'),
+                    reason='set PGEL_SAT_BENCHMARKS to time against the '
+                           'baseline')
+def test_no_regression_against_baseline():
+    baseline = benchmarks.load_report(benchmarks.BASELINE_FILE)
+    report = benchmarks.run_benchmarks(['example', 'small'], repeat=5)
+
+    assert benchmarks.find_regressions(report, baseline,
+                                       TEST_THRESHOLD) == []
@@ -0,0 +1,57 @@
+from pgel_sat import ColumnPool, ProbabilisticKnowledgeBase, solve
+import numpy as np
+import random
+import pytest
+
+
+@pytest.fixture()
+def pool():
+    return ColumnPool(3, capacity=1)
+
+
+def test_column_pool_deduplicates(pool):
+    assert pool.add([1, 0, 1]) == 0
+    assert pool.add([0, 1, 1]) == 1
+    assert pool.add(np.array([1., 0., 1.])) == 0
+    assert len(pool) == 2
+    assert [1, 0, 1] in pool
+    assert [1, 1, 1] not in pool
+
+
+def test_column_pool_invalid_world(pool):
+    with pytest.raises(ValueError):
+        pool.add([1, 0])
+
+
+def test_column_pool_best(pool):
+    assert pool.best(np.ones(3)) == (None, None)
+
+    pool.add([1, 0, 0])
+    pool.add([0, 1, 1])
+    weights = np.array([1., -1., 3.])
+    assert pool.best(weights) == (1, 2.)
+    assert pool.best(weights, {1}) == (0, 1.)
+    assert pool.best(weights, {0, 1}) == (None, None)
+
+
+def test_solve_reuses_pool():
+    random.seed(0)
+    np.random.seed(0)
+    kb = ProbabilisticKnowledgeBase.random(
+        20, 40, 10, 2, 10, -1, 1, 0, 1, 'all', 3)
+
+    first = solve(kb)
+    second = solve(kb, pool=first['pool'])
+    assert first['satisfiable'] == second['satisfiable']
+    assert second['pool_hits'] > 0
+    assert len(second['pool']) >= len(first['pool'])
+
+
+def test_solve_invalid_pool():
+    random.seed(0)
+    np.random.seed(0)
+    kb = ProbabilisticKnowledgeBase.random(
+        20, 40, 10, 2, 10, -1, 1, 0, 1, 'all', 3)
+
+    with pytest.raises(ValueError):
+        solve(kb, pool=ColumnPool(kb.n + 1))
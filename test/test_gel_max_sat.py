@@ -0,0 +1,193 @@
+import random
+from pgel_sat import ProbabilisticKnowledgeBase, gel_max_sat
+from pgel_sat import gel
+import numpy as np
+import pytest
+
+
+@pytest.fixture()
+def chain_kb():
+    kb = ProbabilisticKnowledgeBase('bot', 'top')
+    for iri in ['a', 'B', 'C']:
+        concept_class = gel.IndividualConcept if iri == 'a' else gel.Concept
+        kb.add_concept(concept_class(iri))
+
+    kb.add_axiom('a', 'B', kb.is_a, pbox_id=0)
+    kb.add_axiom('B', 'C', kb.is_a, pbox_id=1)
+    kb.add_axiom('C', 'bot', kb.is_a, pbox_id=2)
+    return kb
+
+
+def vertex(kb, iri):
+    return [c.iri for c in kb.concepts].index(iri)
+
+
+def test_weighted_graph_weights(chain_kb):
+    graph = gel_max_sat.WeightedGraph(chain_kb, [0.5, 0.2, 0.7])
+    a, B = vertex(chain_kb, 'a'), vertex(chain_kb, 'B')
+
+    assert graph.get_weight(a, B) == 0.5
+    assert graph.get_weight(B, a) == 0
+    assert graph.get_weight(graph.init, a) == graph.infinity
+
+
+def test_weighted_graph_reverse_arrows(chain_kb):
+    graph = gel_max_sat.WeightedGraph(chain_kb, [0.5, 0.2, 0.7])
+    arrows = np.arange(graph.size)
+
+    assert (graph.reverse[graph.reverse] == arrows).all()
+    assert (graph.head[graph.reverse] == graph.tails()).all()
+
+
+def test_weighted_graph_increment_weight(chain_kb):
+    graph = gel_max_sat.WeightedGraph(chain_kb, [0.5, 0.2, 0.7])
+    a, B = vertex(chain_kb, 'a'), vertex(chain_kb, 'B')
+
+    graph.increment_weight(B, a, 0.3)
+    assert graph.get_weight(B, a) == pytest.approx(0.3)
+
+
+def test_min_cut_takes_lightest_axiom(chain_kb):
+    result = gel_max_sat.solve(chain_kb, [0.5, 0.2, 0.7])
+    assert result['success']
+    assert result['prob_axiom_indexes'] == [1]
+
+
+def test_negative_weight_axioms_are_always_cut(chain_kb):
+    result = gel_max_sat.solve(chain_kb, [-0.5, 0.2, 0.7])
+    assert result['success']
+    assert sorted(result['prob_axiom_indexes']) == [0]
+
+
+def test_solve_cuts_finds_both_extreme_cuts(chain_kb):
+    result = gel_max_sat.solve_cuts(chain_kb, [0.5, 0.5, 0.7])
+    assert result['success']
+    assert result['cuts'] == [[0], [1]]
+
+    result = gel_max_sat.solve_cuts(chain_kb, [0.5, 0.2, 0.7])
+    assert result['cuts'] == [[1]]
+
+
+@pytest.mark.parametrize('engine', gel_max_sat.ENGINES)
+def test_engines_find_the_same_cut(engine):
+    for seed in range(20):
+        random.seed(seed)
+        kb = gel.KnowledgeBase.random(concepts_count=30,
+                                      axioms_count=20,
+                                      uncertain_axioms_count=60,
+                                      roles_count=2)
+        weights = np.random.default_rng(seed).uniform(-0.2, 1, 60)
+        weights[0] = 60
+
+        expected = gel_max_sat.solve(kb, weights, engine='edmonds-karp')
+        result = gel_max_sat.solve(kb, weights, engine=engine)
+
+        assert result['success'] == expected['success']
+        if expected['success']:
+            assert sorted(result['prob_axiom_indexes']) == \
+                sorted(expected['prob_axiom_indexes'])
+
+
+def test_parallel_certain_axiom_is_never_cut(chain_kb):
+    chain_kb.add_role(gel.Role('r'))
+    chain_kb.add_axiom('B', 'C', 'r')
+
+    result = gel_max_sat.solve(chain_kb, [0.5, 0.2, 0.7])
+    assert result['prob_axiom_indexes'] == [0]
+
+
+def test_parallel_axioms_are_cut_together(chain_kb):
+    chain_kb.add_role(gel.Role('r'))
+    chain_kb.add_axiom('B', 'C', 'r', pbox_id=3)
+
+    result = gel_max_sat.solve(chain_kb, [0.5, 0.1, 0.7, 0.1])
+    assert sorted(result['prob_axiom_indexes']) == [1, 3]
+
+
+def test_invalid_engine(chain_kb):
+    with pytest.raises(ValueError):
+        gel_max_sat.solve(chain_kb, [0.5, 0.2, 0.7], engine='simplex')
+
+
+def test_template_is_reused_across_weights(chain_kb):
+    template = gel_max_sat.NetworkTemplate(chain_kb)
+
+    for weights, expected in [([0.5, 0.2, 0.7], [1]),
+                              ([0.1, 0.2, 0.7], [0]),
+                              ([0.5, 0.2, 0.1], [2])]:
+        result = gel_max_sat.solve(chain_kb, weights, template=template)
+        assert result['prob_axiom_indexes'] == expected
+
+    assert not template.head.flags.writeable
+
+
+def test_min_cut_keeps_weights(chain_kb):
+    graph = gel_max_sat.WeightedGraph(chain_kb, [0.5, 0.2, 0.7])
+    weight = graph.weight.copy()
+
+    gel_max_sat.min_cut(graph)
+
+    assert (graph.weight == weight).all()
+    assert graph.flow().max() == pytest.approx(0.2)
+
+
+def test_graphs_of_one_template_keep_their_flows(chain_kb):
+    template = gel_max_sat.NetworkTemplate(chain_kb)
+    first = template.weighted_graph([0.5, 0.2, 0.7])
+    gel_max_sat.min_cut(first)
+    residual = first.residual
+
+    second = template.weighted_graph([0.1, 0.2, 0.7])
+    gel_max_sat.min_cut(second)
+    assert first.flow().max() == pytest.approx(0.2)
+    assert second.flow().max() == pytest.approx(0.1)
+
+    gel_max_sat.min_cut(first)
+    assert first.residual is residual
+
+
+def test_weighted_graph_is_refilled_in_place(chain_kb):
+    graph = gel_max_sat.NetworkTemplate(chain_kb).weighted_graph(
+        [0.5, 0.2, 0.7])
+    buffers = graph.weight, graph.residual, graph.is_arrow
+
+    for weights, expected in [([0.5, 0.2, 0.7], [1]),
+                              ([0.1, 0.2, 0.7], [0]),
+                              ([0.5, -0.2, 0.1], [1])]:
+        result = gel_max_sat.solve(chain_kb, weights, template=graph)
+        assert sorted(result['prob_axiom_indexes']) == sorted(expected)
+        fresh = gel_max_sat.WeightedGraph(chain_kb, weights)
+        assert (graph.weight == fresh.weight).all()
+        assert (graph.is_arrow == fresh.is_arrow).all()
+
+    for buffer, kept in zip(
+            [graph.weight, graph.residual, graph.is_arrow], buffers):
+        assert buffer is kept
+
+
+@pytest.mark.parametrize('engine', gel_max_sat.ENGINES)
+def test_deep_chain_does_not_recurse(engine):
+    kb = ProbabilisticKnowledgeBase('bot', 'top')
+    iris = [f'C{i}' for i in range(5000)]
+    kb.add_concept(gel.IndividualConcept(iris[0]))
+    for iri in iris[1:]:
+        kb.add_concept(gel.Concept(iri))
+    for sub_iri, sup_iri in zip(iris, iris[1:]):
+        kb.add_axiom(sub_iri, sup_iri, kb.is_a)
+    kb.add_axiom(iris[-1], 'bot', kb.is_a, pbox_id=0)
+
+    result = gel_max_sat.solve(kb, [0.5], engine=engine)
+    assert result['prob_axiom_indexes'] == [0]
+
+
+@pytest.mark.parametrize('engine', gel_max_sat.ENGINES)
+def test_solve_records_flow(chain_kb, engine):
+    records = []
+    gel_max_sat.solve(chain_kb, [0.5, 0.2, 0.7], engine=engine,
+                      on_record=records.append)
+
+    assert len(records) == 1
+    assert records[0].graph_time >= 0 and records[0].flow_time >= 0
+    assert records[0].visited_vertices > 0
+    if engine != 'push-relabel':
+        assert records[0].augmenting_paths > 0
@@ -0,0 +1,118 @@
+import random
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from pgel_sat import ProbabilisticKnowledgeBase, IncrementalSession, solve
+from pgel_sat import gel, gel_max_sat
+
+
+@pytest.fixture()
+def kb():
+    random.seed(3)
+    np.random.seed(3)
+    return ProbabilisticKnowledgeBase.random(
+        concepts_count=40, axioms_count=40, prob_axioms_count=10,
+        axioms_per_restriction=2, prob_restrictions_count=10,
+        coef_lo=-1, coef_hi=1, b_lo=0, b_hi=1, sign_type='all',
+        roles_count=2)
+
+
+@pytest.fixture()
+def fork_kb():
+    # a ⊑ B and a ⊑ C, each with probability at least 1/2
+    kb = ProbabilisticKnowledgeBase('bot', 'top')
+    kb.add_concept(gel.IndividualConcept('a'))
+    kb.add_concept(gel.Concept('B'))
+    kb.add_concept(gel.Concept('C'))
+    kb.add_axiom('a', 'B', kb.is_a, pbox_id=0)
+    kb.add_axiom('a', 'C', kb.is_a, pbox_id=1)
+    kb.add_probabilistic_restrictions(
+        sp.identity(2, format='csr'), np.array([0.5, 0.5]), ['>=', '>='])
+    return kb
+
+
+def assert_valid_pool(session):
+    template = gel_max_sat.NetworkTemplate(session.kb)
+    for world in session.pool.worlds[:len(session.pool)]:
+        assert gel_max_sat.is_consistent(template, world)
+
+
+def test_edits_solve_as_fresh_kb(kb):
+    concepts = [c.iri for c in kb.concepts if c is not kb.init]
+    with IncrementalSession(kb) as session:
+        assert session.solve()['satisfiable'] == solve(kb)['satisfiable']
+
+        for step in range(9):
+            sub_concept, sup_concept = random.sample(concepts, 2)
+            if step % 3 == 0:
+                session.add_axiom(sub_concept, sup_concept, kb.is_a.iri)
+            elif step % 3 == 1:
+                session.add_axiom(sub_concept, sup_concept, kb.is_a.iri,
+                                  pbox_id=kb.n)
+                session.add_restriction([(kb.n - 1, 1.)], '<=', 0.5)
+            else:
+                session.set_restriction(0, '>=', 0.1)
+
+            result = session.solve()
+            assert result['satisfiable'] == solve(kb)['satisfiable']
+            assert result['warm_worlds'] > 0
+            assert_valid_pool(session)
+
+
+def test_warm_start_needs_fewer_iterations(kb):
+    with IncrementalSession(kb) as session:
+        first = session.solve()
+        session.set_restriction(0, '<=', 1)
+        assert session.solve()['iterations'] < first['iterations']
+
+
+def test_invalid_worlds_are_dropped(fork_kb):
+    with IncrementalSession(fork_kb) as session:
+        assert session.solve()['satisfiable']
+        assert session.pool.worlds[:len(session.pool), 0].any()
+
+        session.add_axiom('B', 'bot', fork_kb.is_a)
+        assert not session.solve()['satisfiable']
+        assert_valid_pool(session)
+        assert not session.pool.worlds[:len(session.pool), 0].any()
+
+        assert session.remove_axiom('B', 'bot', fork_kb.is_a)
+        assert session.solve()['satisfiable']
+
+
+def test_added_probabilistic_axiom_keeps_worlds(fork_kb):
+    with IncrementalSession(fork_kb) as session:
+        session.solve()
+        worlds_count = len(session.pool)
+
+        session.add_axiom('B', 'bot', fork_kb.is_a, pbox_id=2)
+        result = session.solve()
+        assert fork_kb.n == 3
+        assert result['warm_worlds'] == worlds_count
+        assert result['satisfiable'] == solve(fork_kb)['satisfiable']
+
+
+def test_existing_axiom_keeps_restrictions(fork_kb):
+    with IncrementalSession(fork_kb) as session:
+        session.solve()
+
+        assert not session.add_axiom('a', 'B', fork_kb.is_a, pbox_id=5)
+        assert fork_kb.A.shape == (2, 2)
+        assert session.pool.n == 2
+        assert session.solve()['warm_worlds'] > 0
+
+
+def test_remove_restriction(fork_kb):
+    with IncrementalSession(fork_kb) as session:
+        session.set_restriction(0, '>=', 1)
+        session.add_axiom('B', 'bot', fork_kb.is_a)
+        assert not session.solve()['satisfiable']
+
+        session.remove_restriction(0)
+        assert fork_kb.k == 1
+        assert session.solve()['satisfiable']
+
+        with pytest.raises(ValueError):
+            session.remove_restriction(1)
@@ -0,0 +1,47 @@
+import random
+
+import numpy as np
+import pytest
+
+from pgel_sat import ProbabilisticKnowledgeBase, Collector, solve
+
+
+@pytest.fixture()
+def kb():
+    random.seed(0)
+    np.random.seed(0)
+    return ProbabilisticKnowledgeBase.random(
+        concepts_count=20, axioms_count=40, prob_axioms_count=6,
+        axioms_per_restriction=2, prob_restrictions_count=6,
+        coef_lo=-1, coef_hi=1, b_lo=0, b_hi=1, sign_type='lo',
+        roles_count=2)
+
+
+def test_records_every_iteration(kb):
+    collector = Collector()
+    result = solve(kb, on_iteration=collector)
+
+    # a pricing that finds no column ends the run with one more record
+    iterations_count = len(result['iteration_times'])
+    assert len(collector) - iterations_count in (0, 1)
+    assert [record.iteration for record in collector.records] == \
+        list(range(len(collector)))
+    assert collector.records[-1].cost == pytest.approx(result['lp'].cost)
+
+    for record in collector.records[:iterations_count]:
+        assert record.columns_added > 0
+        assert record.reduced_cost < 0
+        assert record.oracle_calls > 0
+        assert record.augmenting_paths >= 0
+        assert record.visited_vertices > 0
+        assert record.pricing_time >= record.flow_time
+
+    totals = collector.totals()
+    assert totals['columns_added'] == iterations_count
+    assert len(result['lp_times']) >= len(result['iteration_times'])
+
+
+def test_records_do_not_change_result(kb):
+    collector = Collector()
+    assert solve(kb, on_iteration=collector)['satisfiable'] == \
+        solve(kb)['satisfiable']
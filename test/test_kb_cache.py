@@ -0,0 +1,76 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from pgel_sat import ProbabilisticKnowledgeBase, gel, solve, kb_cache
+
+
+@pytest.fixture()
+def kb():
+    random.seed(0)
+    np.random.seed(0)
+    kb = ProbabilisticKnowledgeBase.random(
+        concepts_count=8, axioms_count=20, prob_axioms_count=3,
+        axioms_per_restriction=1, prob_restrictions_count=3,
+        coef_lo=-1, coef_hi=1, b_lo=0, b_hi=1, sign_type='all',
+        roles_count=2)
+    kb.add_concept(gel.ExistentialConcept('r', '1'))
+    kb.add_role(gel.Role('s'))
+    kb.add_role_inclusion('s', 'r')
+    kb.add_chained_role_inclusion(('r', 's'), 'r')
+    return kb
+
+
+@pytest.fixture()
+def owl_file(tmp_path):
+    owl_file = tmp_path / 'kb.owl'
+    owl_file.write_text('<rdf:RDF/>')
+    return str(owl_file)
+
+
+def sorted_state(kb):
+    graph_state, attributes = kb.__getstate__()
+    graph_state['arrows'] = sorted(graph_state['arrows'])
+    return graph_state, attributes
+
+
+def test_cache_round_trip(kb, owl_file, tmp_path):
+    path = kb_cache.get_path(owl_file, str(tmp_path / 'cache'))
+    kb_cache.store(kb, path)
+    copy = kb_cache.load(ProbabilisticKnowledgeBase, path)
+
+    graph_state, attributes = sorted_state(kb)
+    copy_graph_state, copy_attributes = sorted_state(copy)
+    assert copy_graph_state == graph_state
+    assert (copy_attributes['A'] != attributes['A']).nnz == 0
+    assert (copy_attributes['b'] == attributes['b']).all()
+    assert copy_attributes['signs'] == attributes['signs']
+    assert solve(copy)['satisfiable'] == solve(kb)['satisfiable']
+
+
+def test_cache_misses_edited_file(kb, owl_file, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    kb_cache.store(kb, kb_cache.get_path(owl_file, cache_dir))
+
+    with open(owl_file, 'a') as file:
+        file.write('\n')
+    path = kb_cache.get_path(owl_file, cache_dir)
+
+    assert not os.path.exists(path)
+    assert kb_cache.load(ProbabilisticKnowledgeBase, path) is None
+
+
+def test_cache_rejects_corrupt_entry(kb, owl_file, tmp_path):
+    path = kb_cache.get_path(owl_file, str(tmp_path / 'cache'))
+    kb_cache.store(kb, path)
+    with open(path, 'r+b') as entry:
+        entry.seek(os.path.getsize(path) // 2)
+        entry.write(b'corrupt')
+
+    assert kb_cache.load(ProbabilisticKnowledgeBase, path) is None
+
+    with open(path, 'wb') as entry:
+        entry.write(b'corrupt')
+    assert kb_cache.load(ProbabilisticKnowledgeBase, path) is None
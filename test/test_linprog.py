@@ -0,0 +1,83 @@
+from pgel_sat import linprog
+import numpy as np
+import pytest
+
+
+@pytest.fixture()
+def small_problem():
+    c = np.array([1., 1., 0.])
+    C = np.array([[1., 0., 1.],
+                  [0., 1., 1.]])
+    d = np.array([0.5, 0.5])
+    return c, C, d
+
+
+@pytest.mark.parametrize('method', linprog.LP_METHODS)
+def test_master_problem_matches_single_solve(small_problem, method):
+    c, C, d = small_problem
+    expected = linprog.solve(c, C, d)
+
+    with linprog.create_master_problem(c, C, d, method=method) as master:
+        lp = master.optimize()
+
+    assert lp.cost == pytest.approx(expected.cost, abs=1e-6)
+    assert lp.x == pytest.approx(expected.x, abs=1e-6)
+    assert len(master.optimize_times) == 1
+
+
+@pytest.mark.parametrize('method', linprog.LP_METHODS)
+def test_master_problem_duals_of_inequalities(method):
+    # the duals are the changes of the cost per unit of each bound
+    c = np.array([1., 2., 0.])
+    C = np.array([[1., 1., 0.],
+                  [1., 0., 1.]])
+    d = np.array([1., 3.])
+
+    with linprog.create_master_problem(c, C, d, ['>=', '<='],
+                                       method) as master:
+        lp = master.optimize()
+
+    assert lp.cost == pytest.approx(1, abs=1e-6)
+    assert lp.y == pytest.approx([1, 0], abs=1e-6)
+
+
+def test_invalid_lp_method(small_problem):
+    with pytest.raises(ValueError):
+        linprog.create_master_problem(*small_problem, method='barrier')
+
+
+@pytest.mark.parametrize('method', linprog.LP_METHODS)
+def test_master_problem_add_column_lowers_cost(method):
+    c = np.array([1., 1.])
+    C = np.identity(2)
+    d = np.array([0.5, 0.5])
+
+    with linprog.create_master_problem(c, C, d, method=method) as master:
+        assert master.optimize().cost == pytest.approx(1)
+
+        master.add_column(0, np.array([1., 1.]))
+        lp = master.optimize()
+
+    assert lp.cost == pytest.approx(0, abs=1e-6)
+    assert lp.x == pytest.approx([0, 0, 0.5], abs=1e-6)
+
+
+@pytest.mark.parametrize('has_bulk_helpers', [False, True])
+def test_glpk_arrays_are_filled_in_bulk(has_bulk_helpers, monkeypatch):
+    if has_bulk_helpers and not linprog.has_bulk_helpers():
+        pytest.skip('the swiglpk bulk helpers are broken in this release')
+    monkeypatch.setattr(linprog, 'HAS_BULK_HELPERS', has_bulk_helpers)
+
+    values = np.array([3, 1, 4, 1, 5])
+    int_array = linprog.as_int_array(values)
+    double_array = linprog.as_double_array(values / 2)
+
+    assert [int_array[i] for i in range(1, 6)] == [3, 1, 4, 1, 5]
+    assert [double_array[i] for i in range(1, 6)] == [1.5, 0.5, 2., 0.5, 2.5]
+
+
+def test_solution_vectors_are_arrays(small_problem):
+    c, C, d = small_problem
+    lp = linprog.solve(c, C, d)
+    assert isinstance(lp.x, np.ndarray) and lp.x.shape == (3,)
+    assert isinstance(lp.y, np.ndarray) and lp.y.shape == (2,)
@@ -1,7 +1,15 @@
-from pgel_sat import ProbabilisticKnowledgeBase, solve
-from pgel_sat import gel
+import itertools
+import random
+import numpy as np
+from scipy.optimize import linprog as scipy_linprog
+from pgel_sat import ProbabilisticKnowledgeBase, Session, solve
+from pgel_sat import get_probability_bounds
+from pgel_sat import gel, gel_max_sat
+from pgel_sat.linprog import LP_METHODS
 import pytest
 
+LP_TOL = 1e-6
+
 
 @pytest.fixture()
 def empty_kb():
@@ -50,6 +58,169 @@ def test_example8_is_correct():
     kb = ProbabilisticKnowledgeBase.from_file('./data/example.owl')
     result = solve(kb)
     assert result['satisfiable'] == goal_is_satisfiable
-    assert result['lp'].x == goal_lp_solution_x
-    assert result['lp'].y == goal_lp_solution_y
-    assert result['lp'].cost == goal_lp_solution_cost
+    assert result['lp'].x == pytest.approx(goal_lp_solution_x, abs=LP_TOL)
+    assert result['lp'].y == pytest.approx(goal_lp_solution_y, abs=LP_TOL)
+    assert result['lp'].cost == pytest.approx(goal_lp_solution_cost,
+                                              abs=LP_TOL)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_multiple_columns_keep_the_answer(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    kb = ProbabilisticKnowledgeBase.random(
+        300, 150, 50, 5, 150, -1, 1, 0, 1, 'lo', 3)
+
+    single = solve(kb)
+    batch = solve(kb, max_columns=10)
+    assert batch['satisfiable'] == single['satisfiable']
+    assert batch['iterations'] <= single['iterations']
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_lp_methods_agree(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    kb = ProbabilisticKnowledgeBase.random(
+        100, 70, 20, 2, 20, -1, 1, 0, 1, 'lo', 3)
+
+    results = [solve(kb, lp_method) for lp_method in LP_METHODS]
+    assert len({result['satisfiable'] for result in results}) == 1
+    for result in results:
+        assert len(result['lp_times']) == result['iterations'] + 1
+
+
+def test_lp_methods_agree_on_bounds():
+    # the KBs mix satisfiable and unsatisfiable ones, so that a backend
+    # answering unsatisfiable wrongly is caught as well
+    satisfiable = set()
+    for seed in range(30):
+        random.seed(seed)
+        np.random.seed(seed)
+        kb = ProbabilisticKnowledgeBase.random(
+            30, 25, 8, 2, 8, -1, 1, 0, 1, 'all', 2)
+
+        expected = get_probability_bounds(kb, 0, 'interior')
+        satisfiable.add(expected is not None)
+        for lp_method in LP_METHODS:
+            bounds = get_probability_bounds(kb, 0, lp_method)
+            if expected is None:
+                assert bounds is None
+            else:
+                assert bounds == pytest.approx(expected, abs=LP_TOL)
+    assert satisfiable == {False, True}
+
+
+def small_random_kb(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    return ProbabilisticKnowledgeBase.random(
+        6, 5, 4, 2, 4, -1, 1, 0, 1, 'all', 1)
+
+
+def brute_force_bounds(kb, pbox_id):
+    '''Returns the bounds of the probability of `pbox_id` over every
+    mixture of the worlds enumerated one by one, or None when none meets
+    the restrictions.'''
+    template = gel_max_sat.NetworkTemplate(kb)
+    worlds = np.array([world
+                       for world in itertools.product([0, 1], repeat=kb.n)
+                       if gel_max_sat.is_consistent(template, world)])
+    if len(worlds) == 0:
+        return None
+
+    rows = kb.A @ worlds.T
+    sign_coefs = {'<=': 1, '>=': -1}
+    is_eq = np.array([sign == '==' for sign in kb.signs], dtype=bool)
+    coefs = np.array([sign_coefs.get(sign, 1) for sign in kb.signs])
+    bounds = []
+    for coef in (1, -1):
+        result = scipy_linprog(
+            coef * worlds[:, pbox_id],
+            A_ub=(coefs[:, None] * rows)[~is_eq],
+            b_ub=(coefs * kb.b)[~is_eq],
+            A_eq=np.vstack((rows[is_eq], np.ones(len(worlds)))),
+            b_eq=np.append(kb.b[is_eq], 1), method='highs')
+        if result.status != 0:
+            return None
+        bounds += [coef * result.fun]
+    return tuple(bounds)
+
+
+@pytest.mark.parametrize('lp_method', LP_METHODS)
+def test_lp_methods_match_brute_force(lp_method):
+    for seed in range(60):
+        kb = small_random_kb(seed)
+        expected = brute_force_bounds(kb, 0)
+
+        assert solve(kb, lp_method)['satisfiable'] == (expected is not None)
+        bounds = get_probability_bounds(kb, 0, lp_method)
+        if expected is None:
+            assert bounds is None
+        else:
+            assert bounds == pytest.approx(expected, abs=LP_TOL)
+
+
+def test_invalid_max_columns(empty_kb):
+    with pytest.raises(ValueError):
+        solve(empty_kb, max_columns=0)
+
+
+@pytest.fixture()
+def two_axioms_kb(empty_kb):
+    kb = empty_kb
+    kb.add_concept(gel.IndividualConcept('a'))
+    kb.add_concept(gel.Concept('B'))
+    kb.add_concept(gel.Concept('C'))
+    kb.add_axiom('a', 'B', kb.is_a, pbox_id=0)
+    kb.add_axiom('a', 'C', kb.is_a, pbox_id=1)
+
+    kb.add_probabilistic_restrictions(
+        np.array([[1., 1.], [1., 0.]]), np.array([1., 0.3]), ['==', '<='])
+    return kb
+
+
+@pytest.mark.parametrize('lp_method', LP_METHODS)
+def test_probability_bounds(two_axioms_kb, lp_method):
+    assert get_probability_bounds(two_axioms_kb, 0, lp_method) == \
+        pytest.approx((0, 0.3), abs=LP_TOL)
+    assert get_probability_bounds(two_axioms_kb, 1, lp_method) == \
+        pytest.approx((0.7, 1), abs=LP_TOL)
+
+
+def test_probability_bounds_keep_the_session(two_axioms_kb):
+    with Session(two_axioms_kb) as session:
+        assert session.get_probability_bounds(1) == \
+            pytest.approx((0.7, 1), abs=LP_TOL)
+        assert session.solve()['satisfiable']
+
+
+def test_probability_bounds_of_unsatisfiable_kb(two_axioms_kb):
+    two_axioms_kb.add_axiom('B', 'bot', two_axioms_kb.is_a)
+    two_axioms_kb.add_axiom('C', 'bot', two_axioms_kb.is_a)
+    assert get_probability_bounds(two_axioms_kb, 0) is None
+
+
+def test_probability_bounds_invalid_pbox_id(two_axioms_kb):
+    with pytest.raises(ValueError):
+        get_probability_bounds(two_axioms_kb, 2)
+
+
+@pytest.mark.parametrize('lp_method', LP_METHODS)
+def test_session_set_restriction(two_axioms_kb, lp_method):
+    with Session(two_axioms_kb, lp_method) as session:
+        assert session.solve()['satisfiable']
+
+        session.set_restriction(0, '==', 2)
+        assert not session.solve()['satisfiable']
+
+        session.set_restriction(1, '>=', 0.5)
+        result = session.solve()
+        assert result['satisfiable']
+        assert result['iterations'] <= 1
+
+
+def test_session_invalid_restriction(two_axioms_kb):
+    with Session(two_axioms_kb) as session:
+        with pytest.raises(ValueError):
+            session.set_restriction(2, '<=', 1)
@@ -0,0 +1,36 @@
+from pgel_sat.sparse import ColumnMatrix
+import numpy as np
+import scipy.sparse as sp
+import pytest
+
+
+@pytest.fixture()
+def column_matrix():
+    return ColumnMatrix.from_sparse(sp.identity(3))
+
+
+def test_column_matrix_from_sparse(column_matrix):
+    assert column_matrix.shape == (3, 3)
+    assert (column_matrix.tocsc().toarray() == np.identity(3)).all()
+
+
+def test_column_matrix_append_column(column_matrix):
+    for _ in range(40):
+        column_matrix.append_column(np.array([1., 0., 2.]))
+
+    assert column_matrix.shape == (3, 43)
+    assert column_matrix.nonzeros_count == 3 + 2 * 40
+
+    expected = np.hstack((np.identity(3), np.tile([[1.], [0.], [2.]], 40)))
+    assert (column_matrix.tocsc().toarray() == expected).all()
+
+
+def test_column_matrix_product(column_matrix):
+    column_matrix.append_column(np.array([1., 1., 1.]))
+    x = np.array([1., 2., 3., 4.])
+    assert (column_matrix @ x == [5., 6., 7.]).all()
+
+
+def test_column_matrix_invalid_column(column_matrix):
+    with pytest.raises(ValueError):
+        column_matrix.append_column(np.ones(4))
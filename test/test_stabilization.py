@@ -0,0 +1,67 @@
+from pgel_sat import ProbabilisticKnowledgeBase, solve
+from pgel_sat import stabilization
+import numpy as np
+import random
+import pytest
+
+
+@pytest.fixture()
+def d():
+    return np.array([0., 0., 1.])
+
+
+def test_invalid_stabilization(d):
+    with pytest.raises(ValueError):
+        stabilization.get_stabilizer('smoothing', d)
+
+
+def test_no_stabilization(d):
+    assert stabilization.get_stabilizer(None, d) is None
+
+
+def test_base_stabilizer_prices_with_the_duals(d):
+    stabilizer = stabilization.Stabilizer(d)
+    stabilizer.start(np.array([1., 1., 1.]))
+    stabilizer.update(stabilizer.weights(), 0.)
+
+    stabilizer.start(np.array([-4., 3., 0.5]))
+    assert stabilizer.is_exact(stabilizer.weights())
+
+
+@pytest.mark.parametrize('name', stabilization.STABILIZATIONS)
+def test_mispricing_reaches_the_duals(name, d):
+    stabilizer = stabilization.get_stabilizer(name, d)
+    stabilizer.start(np.array([1., 1., 1.]))
+    stabilizer.update(stabilizer.weights(), 0.)
+
+    stabilizer.start(np.array([-4., 3., 0.5]))
+    weights = stabilizer.weights()
+    assert not stabilizer.is_exact(weights)
+
+    for _ in range(100):
+        if stabilizer.is_exact(weights):
+            break
+        stabilizer.mispriced()
+        weights = stabilizer.weights()
+    assert stabilizer.is_exact(weights)
+
+
+def test_center_keeps_the_best_bound(d):
+    stabilizer = stabilization.Wentges(d)
+    stabilizer.update(np.array([0., 0., 1.]), 2.)
+    stabilizer.update(np.array([0., 0., 0.5]), 0.)
+    stabilizer.update(np.array([0., 0., 0.2]), 0.)
+    assert stabilizer.center_bound == 0.5
+    assert (stabilizer.center == [0., 0., 0.5]).all()
+
+
+@pytest.mark.parametrize('name', stabilization.STABILIZATIONS)
+def test_stabilization_keeps_the_answer(name):
+    for seed in range(6):
+        random.seed(seed)
+        np.random.seed(seed)
+        kb = ProbabilisticKnowledgeBase.random(
+            20, 40, 10, 2, 10, -1, 1, 0, 1, 'all', 3)
+
+        expected = solve(kb)['satisfiable']
+        assert solve(kb, stabilization=name)['satisfiable'] == expected